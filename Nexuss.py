@@ -27,7 +27,6 @@ License: MIT
 """
 
 from __future__ import annotations
-git pull 
 import warnings
 warnings.filterwarnings("ignore", message=".*optree.*", category=FutureWarning)
 
@@ -81,20 +80,17 @@ from ollama import (
     Tool,
 )
 
-from config import DEFAULT_MODEL, HEARTBEAT_INTERVAL_SECONDS, LOG_PATH, __version__, __codename__
+from config import DEFAULT_MODEL, DEFAULT_QUANT, DEFAULT_TEMPERATURE, HEARTBEAT_INTERVAL_SECONDS, LOG_PATH, QUANT_MODES, __version__, __codename__
 from skill_registry import SkillRegistry
 from server_management import ensure_server
 from nexuss_agent import NexussAgent
 from memory_system import MemoryManager
+from Utils import start_queue_logging
 
 # ══════════════════════════════════════════════════════════════════════════════
 #  LOGGING SETUP
 # ══════════════════════════════════════════════════════════════════════════════
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-    handlers=[logging.FileHandler(LOG_PATH, encoding="utf-8")]
-)
+start_queue_logging(logging.FileHandler(LOG_PATH, encoding="utf-8"))
 logger = logging.getLogger("Nexuss")
 
 
@@ -102,7 +98,8 @@ logger = logging.getLogger("Nexuss")
 #  MAIN ENTRY POINT
 # ══════════════════════════════════════════════════════════════════════════════
 
-def main() -> None:
+def build_parser():
+    # argparse is only needed for the CLI; keep it off the plain-import path
     import argparse
     parser = argparse.ArgumentParser(description="Nexuss Agent - Open CLAW Architecture")
     parser.add_argument("-m", "--model", type=str, default=DEFAULT_MODEL, help="Model name")
@@ -112,17 +109,37 @@ def main() -> None:
     parser.add_argument("-p", "--prompt", type=str, help="Single prompt mode")
     parser.add_argument("--local-model", type=str, help="Path to local Hugging Face model directory")
     parser.add_argument("--mindroot", action="store_true", help="Enable stochastic background thought generation")
-    args = parser.parse_args()
+    parser.add_argument("--quant", choices=QUANT_MODES, default=DEFAULT_QUANT, help="Local model weight quantization (CUDA only)")
+    parser.add_argument("--compile", action="store_true", help="torch.compile the local model's forward pass (CUDA only)")
+    parser.add_argument("--temperature", type=float, default=DEFAULT_TEMPERATURE, help="Local model sampling temperature (0 = greedy, cacheable)")
+    parser.add_argument("--semantic-cache", action="store_true", help="Answer near-duplicate prompts from a semantic response cache")
+    parser.add_argument("--self-update", action="store_true", help="Fast-forward the checkout with git pull before starting")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
 
     if args.version:
         print(f"Nexuss Agent v{__version__} ({__codename__})")
         sys.exit(0)
 
+    if args.self_update:
+        try:
+            subprocess.run(["git", "pull", "--ff-only"], check=False, timeout=10,
+                           cwd=os.path.dirname(os.path.abspath(__file__)))
+        except (OSError, subprocess.TimeoutExpired) as e:
+            logging.warning(f"Self-update failed: {e}")
+
     agent = NexussAgent(
         model_name=args.model,
         heartbeat_interval=args.heartbeat,
         local_model_path=args.local_model,
         enable_mindroot=args.mindroot,
+        quant=args.quant,
+        semantic_cache=args.semantic_cache,
+        compile_model=args.compile,
+        temperature=args.temperature,
     )
 
     if args.status:
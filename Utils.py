@@ -1,9 +1,16 @@
+import atexit
 import hashlib
 import json
 import logging
+import os
+import queue
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
 from colorama import Fore, Style, init
 from datetime import datetime
 from pathlib import Path
+from typing import Any, Callable, Optional, Union
+from utils_fast import count_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -14,7 +21,30 @@ try:
 except ImportError:
     COLOR_ENABLED = False
 
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+# FIPS-constrained deployments must stick to approved digests
+FIPS_MODE = bool(os.environ.get("NEXUSS_FIPS"))
+
+try:
+    import orjson
+
+    def json_dumps(obj: Any, indent: bool = False, default: Optional[Callable] = None) -> bytes:
+        option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=default, option=option)
+
+    json_loads = orjson.loads
+except ImportError:
+    def json_dumps(obj: Any, indent: bool = False, default: Optional[Callable] = None) -> bytes:
+        return json.dumps(obj, indent=2 if indent else None, default=default).encode("utf-8")
+
+    json_loads = json.loads
+
 CONFIG_PATH = Path.home() / ".nexuss" / "config.json"
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
 
 # ══════════════════════════════════════════════════════════════════════════════
 #  UTILITY FUNCTIONS
@@ -22,35 +52,66 @@ CONFIG_PATH = Path.home() / ".nexuss" / "config.json"
 def c(text: str, color: str = "") -> str:
     """Colorize text if color support is enabled."""
     if not COLOR_ENABLED or not color:
-        return str(text)
+        return text if type(text) is str else str(text)
     reset = getattr(Style, 'RESET_ALL', '')
     return f"{color}{text}{reset}"
 
 def timestamp() -> str:
     return datetime.now().isoformat()
 
-def hash_content(content: str) -> str:
-    return hashlib.sha256(content.encode()).hexdigest()[:12]
+def hash_content(content: Union[str, bytes]) -> str:
+    # Content IDs only need a fingerprint: xxh3-64 when installed, else a
+    # truncated SHA-256 digest. Both yield 16 hex chars.
+    data = content if isinstance(content, bytes) else content.encode()
+    if xxhash is not None and not FIPS_MODE:
+        return xxhash.xxh3_64_hexdigest(data)
+    return hashlib.sha256(data).hexdigest()[:16]
 
 def truncate(text: str, max_len: int = 100) -> str:
-    return text[:max_len-3] + "..." if len(text) > max_len else text
+    return text if len(text) <= max_len else text[:max_len - 3] + "..."
+
+def _estimate_tokens(text: str) -> int:
+    # One scale for every length: budgets sum short and long items together
+    return count_tokens(text.encode("utf-8"))
+
+@lru_cache(maxsize=4096)
+def _estimate_tokens_cached(text: str) -> int:
+    return _estimate_tokens(text)
 
 def estimate_tokens(text: str) -> int:
-    return len(text) // 4
+    # Only memoize short strings; hashing a huge blob costs more than it saves
+    if len(text) < 2048:
+        return _estimate_tokens_cached(text)
+    return _estimate_tokens(text)
 
 def load_config() -> dict:
     if CONFIG_PATH.exists():
         try:
-            with open(CONFIG_PATH, "r") as f:
-                return json.load(f)
+            with open(CONFIG_PATH, "rb") as f:
+                return json_loads(f.read())
         except Exception:
             pass
     return {}
 
 def save_config(cfg: dict) -> None:
     try:
-        with open(CONFIG_PATH, "w") as f:
-            json.dump(cfg, f, indent=2)
+        with open(CONFIG_PATH, "wb") as f:
+            f.write(json_dumps(cfg, indent=True))
     except Exception:
         pass
 
+def start_queue_logging(*handlers: logging.Handler, level: int = logging.INFO) -> QueueListener:
+    """Route root logging through a queue drained by a background listener thread."""
+    formatter = logging.Formatter(LOG_FORMAT)
+    for h in handlers:
+        h.setFormatter(formatter)
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    # The queue side only renders the message; the real formatting happens on
+    # the listener so records are not formatted twice.
+    qh = QueueHandler(log_queue)
+    qh.setFormatter(logging.Formatter("%(message)s"))
+    logging.basicConfig(level=level, handlers=[qh], force=True)
+    return listener
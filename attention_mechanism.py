@@ -1,4 +1,5 @@
 import logging
+from collections import deque
 from typing import List, Optional, Dict, Any, Tuple
 from ollama import Message
 from config import ATTENTION_WINDOW_TOKENS
@@ -7,6 +8,9 @@ from memory_system import MemoryManager
 from Utils import estimate_tokens, truncate
 
 logger = logging.getLogger(__name__)
+
+_CORE_HDR = "\n\n### CORE MEMORY ###\n"
+_MEM_HDR = "\n\n### RELEVANT MEMORIES ###\n"
 # ══════════════════════════════════════════════════════════════════════════════
 #  ATTENTION MECHANISM
 # ══════════════════════════════════════════════════════════════════════════════
@@ -21,32 +25,42 @@ class AttentionManager:
     def build_context(self, system_prompt: str, focus_query: Optional[str] = None) -> tuple[List[Message], AttentionContext]:
         messages: List[Message] = []
         system_tokens = estimate_tokens(system_prompt)
-        core_content = self.memory.get_core_memory()
-        core_tokens = estimate_tokens(core_content)
-        full_system = f"{system_prompt}\n\n### CORE MEMORY ###\n{core_content}"
-        messages.append(Message(role="system", content=full_system))
+        core_content, core_tokens = self.memory.get_core_memory_with_tokens()
         used_tokens = system_tokens + core_tokens
         remaining = self.max_tokens - used_tokens - 500
 
+        # Decide on archival content first so the system message is built once.
+        # The search runs inline: it shares MemoryManager._lock with the core and
+        # recall reads, so a worker thread could not overlap them anyway.
+        archival_content = ""
         if focus_query:
             archival_results = self.memory.search_archival(focus_query, limit=5)
-            if archival_results:
-                archival_parts = [f"- {truncate(b.content, 200)}" for b in archival_results]
-                archival_content = "\n### RELEVANT MEMORIES ###\n" + "\n".join(archival_parts)
-                archival_tokens = estimate_tokens(archival_content)
-                if archival_tokens < remaining // 3:
-                    messages[0] = Message(role="system", content=full_system + "\n" + archival_content)
-                    used_tokens += archival_tokens
-                    remaining -= archival_tokens
+            # Add memories one at a time and stop as soon as the budget is hit
+            budget = remaining // 3
+            archival_tokens = 0
+            archival_parts = []
+            for b in archival_results:
+                line = f"- {truncate(b.content, 200)}"
+                line_tokens = estimate_tokens(line)
+                if archival_tokens + line_tokens > budget:
+                    break
+                archival_parts.append(line)
+                archival_tokens += line_tokens
+            if archival_parts:
+                archival_content = _MEM_HDR + "\n".join(archival_parts)
+                used_tokens += archival_tokens
+                remaining -= archival_tokens
+
+        full_system = "".join((system_prompt, _CORE_HDR, core_content, archival_content))
+        messages.append(Message(role="system", content=full_system))
 
-        recall_messages = self.memory.get_recall_messages()
-        recall_to_add = []
+        recall_to_add: deque[Message] = deque()
         recall_tokens = 0
-        for msg in reversed(recall_messages):
+        for msg in self.memory.iter_recall_reversed():
             msg_tokens = estimate_tokens(msg.content or "")
             if recall_tokens + msg_tokens > remaining:
                 break
-            recall_to_add.insert(0, msg)
+            recall_to_add.appendleft(msg)
             recall_tokens += msg_tokens
         messages.extend(recall_to_add)
         used_tokens += recall_tokens
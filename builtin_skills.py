@@ -1,7 +1,8 @@
 
 import queue
-import threading
+import re
 import logging
+from typing import Callable, List
 from enums_and_dataclasses import SkillCategory, SkillResult
 from memory_system import MemoryManager
 from skills_tools_framework import Skill
@@ -9,6 +10,19 @@ from Utils import truncate
 
 logger = logging.getLogger(__name__)
 
+# Shared results for fixed-shape replies. SkillRegistry skips the timing stamp
+# on results marked shared, so these can be handed out repeatedly.
+_OK_SENT = SkillResult(success=True, output="Sent.", shared=True)
+_OK_EMPTY_CORE = SkillResult(success=True, output="", shared=True)
+_OK_HEARTBEAT_PREFIX = "Heartbeat scheduled: "
+
+# One comma-separated tag with surrounding whitespace trimmed
+_TAG_RE = re.compile(r"[^,\s](?:[^,]*[^,\s])?")
+
+
+def _parse_tags(tags: str) -> List[str]:
+    return _TAG_RE.findall(tags)
+
 # ══════════════════════════════════════════════════════════════════════════════
 #  BUILT-IN SKILLS
 # ══════════════════════════════════════════════════════════════════════════════
@@ -34,7 +48,8 @@ class CoreMemoryReadSkill(Skill):
     def __init__(self, memory: MemoryManager):
         self.memory = memory
     def execute(self) -> SkillResult:
-        return SkillResult(success=True, output=self.memory.get_core_memory())
+        core = self.memory.get_core_memory()
+        return SkillResult(success=True, output=core) if core else _OK_EMPTY_CORE
 
 class ArchivalWriteSkill(Skill):
     name = "archival_memory_write"
@@ -47,7 +62,7 @@ class ArchivalWriteSkill(Skill):
     def __init__(self, memory: MemoryManager):
         self.memory = memory
     def execute(self, content: str, tags: str = "") -> SkillResult:
-        tag_list = [t.strip() for t in tags.split(",") if t.strip()]
+        tag_list = _parse_tags(tags)
         bid = self.memory.add_to_archival(content, tag_list)
         return SkillResult(success=True, output=f"Archived: {bid}")
 
@@ -62,14 +77,13 @@ class ArchivalSearchSkill(Skill):
     def __init__(self, memory: MemoryManager):
         self.memory = memory
     def execute(self, query: str, tags: str = "") -> SkillResult:
-        tag_list = [t.strip() for t in tags.split(",") if t.strip()] or None
+        tag_list = _parse_tags(tags) or None
         results = self.memory.search_archival(query, tags=tag_list)
         if not results:
             return SkillResult(success=True, output="No matches found.")
-        out = f"Found {len(results)} results:\n"
-        for i, b in enumerate(results[:10], 1):
-            out += f"{i}. [{b.id}] {truncate(b.content,150)}\n"
-        return SkillResult(success=True, output=out)
+        lines = [f"Found {len(results)} results:"]
+        lines.extend(f"{i}. [{b.id}] {truncate(b.content,150)}" for i, b in enumerate(results[:10], 1))
+        return SkillResult(success=True, output="\n".join(lines))
 
 class RecallBufferSkill(Skill):
     name = "recall_buffer_read"
@@ -82,10 +96,9 @@ class RecallBufferSkill(Skill):
         msgs = self.memory.get_recall_messages(limit)
         if not msgs:
             return SkillResult(success=True, output="Recall empty.")
-        out = f"Last {len(msgs)} messages:\n"
-        for m in msgs:
-            out += f"[{m.role.upper()}] {truncate(m.content or '', 100)}\n"
-        return SkillResult(success=True, output=out)
+        lines = [f"Last {len(msgs)} messages:"]
+        lines.extend(f"[{m.role.upper()}] {truncate(m.content or '', 100)}" for m in msgs)
+        return SkillResult(success=True, output="\n".join(lines))
 
 class SendMessageSkill(Skill):
     name = "send_message"
@@ -96,16 +109,16 @@ class SendMessageSkill(Skill):
         self.output_queue = output_queue
     def execute(self, message: str) -> SkillResult:
         self.output_queue.put(("message", message))
-        return SkillResult(success=True, output="Sent.")
+        return _OK_SENT
 
 class RequestHeartbeatSkill(Skill):
     name = "request_heartbeat"
     description = "Request another thinking cycle"
     category = SkillCategory.SYSTEM
     parameters = {"reason": {"type": "string", "description": "Reason"}}
-    def __init__(self, heartbeat_flag: threading.Event):
-        self.heartbeat_flag = heartbeat_flag
+    def __init__(self, request_heartbeat: Callable[[], None]):
+        self.request_heartbeat = request_heartbeat
     def execute(self, reason: str = "") -> SkillResult:
-        self.heartbeat_flag.set()
+        self.request_heartbeat()
         logger.info(f"Heartbeat requested: {reason}")
-        return SkillResult(success=True, output=f"Heartbeat scheduled: {reason}")
+        return SkillResult(success=True, output=_OK_HEARTBEAT_PREFIX + reason)
@@ -10,6 +10,13 @@ __codename__ = "OPEN CLAW"
 HEARTBEAT_INTERVAL_SECONDS = 60  # 1 minute heartbeat
 HEARTBEAT_MAX_MISSED = 3         # Max missed heartbeats before alarm
 LOCAL_MODEL_TIMEOUT_SECONDS = 120  # Max generation time per request
+HEARTBEAT_BATCH_MAX = 8          # Max inputs coalesced into one beat
+HEARTBEAT_BATCH_WINDOW_MS = 50   # How long a beat waits for more input
+
+# Local model quantization (bitsandbytes, CUDA only)
+QUANT_MODES = ("none", "int8", "nf4")
+DEFAULT_QUANT = "nf4"
+DEFAULT_TEMPERATURE = 0.7        # Local model sampling; 0 = greedy, which enables the response cache
 
 # Memory Configuration
 CORE_MEMORY_LIMIT = 2048         # Characters for core memory
@@ -17,11 +24,17 @@ RECALL_MEMORY_LIMIT = 100        # Max messages in recall buffer
 ARCHIVAL_SEARCH_LIMIT = 50       # Max archival search results
 ATTENTION_WINDOW_TOKENS = 4096   # Context window size estimation
 
+# Semantic response cache (opt-in, --semantic-cache)
+SEMANTIC_CACHE_SIZE = 256        # Max cached (embedding, response) pairs
+SEMANTIC_CACHE_THRESHOLD = 0.95  # Min cosine similarity for a hit
+
 # Paths
 DATA_DIR = Path.home() / ".nexuss"
 CONFIG_PATH = DATA_DIR / "config.json"
 MEMORY_PATH = DATA_DIR / "memory"
 ARCHIVAL_PATH = DATA_DIR / "archival"
+ARCHIVAL_DB_PATH = ARCHIVAL_PATH / "archival.db"
+SEMANTIC_CACHE_DB_PATH = MEMORY_PATH / "semantic_cache.db"
 SKILLS_PATH = DATA_DIR / "skills"
 LOG_PATH = DATA_DIR / "nexuss.log"
 STATE_PATH = DATA_DIR / "agent_state.pkl"
@@ -29,7 +29,7 @@ class SkillCategory(Enum):
     UTILITY = "utility"
     CUSTOM = "custom"
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class MemoryBlock:
     id: str
     content: str
@@ -49,7 +49,7 @@ class MemoryBlock:
             "tags": self.tags,
         }
 
-@dataclass
+@dataclass(slots=True)
 class HeartbeatEvent:
     beat_id: int
     timestamp: str
@@ -58,7 +58,7 @@ class HeartbeatEvent:
     pending_tasks: int
     notes: str = ""
 
-@dataclass
+@dataclass(slots=True)
 class AttentionContext:
     total_tokens: int = 0
     core_tokens: int = 0
@@ -68,9 +68,10 @@ class AttentionContext:
     focus_topic: Optional[str] = None
     priority_memories: List[str] = field(default_factory=list)
 
-@dataclass
+@dataclass(slots=True)
 class SkillResult:
     success: bool
     output: Any
     error: Optional[str] = None
-    execution_time: float = 0.0
\ No newline at end of file
+    execution_time: float = 0.0
+    shared: bool = field(default=False, repr=False, compare=False)  # Pooled instance; never mutate
\ No newline at end of file
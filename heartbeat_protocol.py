@@ -1,24 +1,42 @@
 import threading
 import queue
-import json
+import time
 import logging
-import traceback
 import inspect
 from typing import Optional, Tuple, List, Dict, Any
 from datetime import datetime
 from collections import deque
+from types import SimpleNamespace
 from ollama import ChatResponse, Message, ResponseError, RequestError
-from config import HEARTBEAT_INTERVAL_SECONDS, HEARTBEAT_MAX_MISSED, LOCAL_MODEL_TIMEOUT_SECONDS
+from config import (HEARTBEAT_INTERVAL_SECONDS, HEARTBEAT_MAX_MISSED, LOCAL_MODEL_TIMEOUT_SECONDS,
+                    HEARTBEAT_BATCH_MAX, HEARTBEAT_BATCH_WINDOW_MS)
 from enums_and_dataclasses import AgentState, HeartbeatEvent
 from memory_system import MemoryManager
 from skill_registry import SkillRegistry
 from attention_mechanism import AttentionManager
 from builtin_skills import RequestHeartbeatSkill, SendMessageSkill
 from local_model_wrapper import LocalModel
-from Utils import timestamp
+from Utils import timestamp, json_dumps
 
 logger = logging.getLogger(__name__)
 
+
+# Control items sharing the input queue with user messages
+_STOP = object()
+_BEAT = object()
+
+
+def _drain(q: queue.Queue, limit: int) -> list:
+    """Take up to ``limit`` queued items in a single critical section; the rest stay queued."""
+    if limit <= 0:
+        return []
+    with q.mutex:
+        pending = q.queue
+        items = [pending.popleft() for _ in range(min(limit, len(pending)))]
+        if items:
+            q.not_full.notify_all()
+    return items
+
 # ══════════════════════════════════════════════════════════════════════════════
 #  HEARTBEAT PROTOCOL
 # ══════════════════════════════════════════════════════════════════════════════
@@ -42,8 +60,6 @@ Memory systems:
 - ARCHIVAL MEMORY: Long-term searchable storage
 
 Use send_message to respond. Use request_heartbeat for more processing time.
-
-Current: {timestamp} | Heartbeat #{beat_count}
 """
 
     LOCAL_SYSTEM_PROMPT = """You are Nexuss, an AI agent. Answer the user helpfully and concisely.
@@ -52,14 +68,14 @@ YOU HAVE THESE INTERNAL SYSTEMS:
 {status_block}
 
 If the user asks about heartbeats, thoughts, dreams, or your internal state, use the information above to answer accurately. For example: "I have had X heartbeats so far" or "My latest thought was about Y".
-
-Current time: {timestamp}
 """
 
     def __init__(self, llm, model_name: str, memory: MemoryManager,
                  skills: SkillRegistry, attention: AttentionManager,
                  interval: float = HEARTBEAT_INTERVAL_SECONDS):
         self.llm = llm
+        self._llm_supports_timeout = "timeout_seconds" in inspect.signature(llm.chat).parameters
+        self._status_prefix_cache: Optional[Tuple[Tuple, str]] = None
         self.model_name = model_name
         self.memory = memory
         self.skills = skills
@@ -73,7 +89,7 @@ Current time: {timestamp}
         self.heartbeat_history: deque[HeartbeatEvent] = deque(maxlen=100)
 
         self._stop_event = threading.Event()
-        self._heartbeat_requested = threading.Event()
+        # User messages plus _BEAT/_STOP; the loop blocks on this queue
         self._user_input_queue: queue.Queue = queue.Queue()
         self._output_queue: queue.Queue = queue.Queue()
         self._heartbeat_thread: Optional[threading.Thread] = None
@@ -82,7 +98,7 @@ Current time: {timestamp}
         self._is_local = isinstance(llm, LocalModel)
         self.mindroot = None  # Set later via set_mindroot()
         self.skills.register(SendMessageSkill(self._output_queue))
-        self.skills.register(RequestHeartbeatSkill(self._heartbeat_requested))
+        self.skills.register(RequestHeartbeatSkill(self.request_heartbeat))
 
     def start(self) -> None:
         if self._heartbeat_thread and self._heartbeat_thread.is_alive():
@@ -95,14 +111,18 @@ Current time: {timestamp}
 
     def stop(self) -> None:
         self._stop_event.set()
-        if self._heartbeat_thread:
+        if self._heartbeat_thread and self._heartbeat_thread.is_alive():
+            self._user_input_queue.put(_STOP)
             self._heartbeat_thread.join(timeout=5.0)
         self.state = AgentState.SHUTDOWN
         logger.info("Heartbeat protocol stopped")
 
     def send_user_input(self, message: str) -> None:
         self._user_input_queue.put(message)
-        self._heartbeat_requested.set()
+
+    def request_heartbeat(self) -> None:
+        """Run a heartbeat now instead of waiting for the interval."""
+        self._user_input_queue.put(_BEAT)
 
     def get_output(self, timeout: float = 0.1) -> Optional[Tuple]:
         try:
@@ -112,50 +132,65 @@ Current time: {timestamp}
 
     def _heartbeat_loop(self) -> None:
         logger.info(f"Heartbeat loop started (interval: {self.interval}s)")
+        q = self._user_input_queue
         while not self._stop_event.is_set():
             try:
-                triggered = self._heartbeat_requested.wait(timeout=self.interval)
-                self._heartbeat_requested.clear()
-                if self._stop_event.is_set():
+                try:
+                    items = [q.get(timeout=self.interval)]
+                    triggered = True
+                except queue.Empty:
+                    items = []
+                    triggered = False
+                if triggered:
+                    self._collect_batch(q, items)
+                # Overflow past the cap stays queued and triggers the next beat at once
+                items.extend(_drain(q, HEARTBEAT_BATCH_MAX - len(items)))
+                if _STOP in items or self._stop_event.is_set():
                     break
-                self._execute_heartbeat(triggered_by_event=triggered)
+                user_messages = [m for m in items if m is not _BEAT]
+                self._execute_heartbeat(user_messages, triggered_by_event=triggered)
             except Exception as e:
-                logger.error(f"Heartbeat error: {e}\n{traceback.format_exc()}")
+                logger.error(f"Heartbeat error: {e}", exc_info=True)
                 self.missed_beats += 1
                 if self.missed_beats >= HEARTBEAT_MAX_MISSED:
                     logger.critical("Too many missed heartbeats!")
                     self.state = AgentState.ERROR
-                    
 
+    @staticmethod
+    def _collect_batch(q: queue.Queue, items: list) -> None:
+        """Give a burst of input a short window to land in the same beat."""
+        deadline = time.monotonic() + HEARTBEAT_BATCH_WINDOW_MS / 1000
+        while len(items) < HEARTBEAT_BATCH_MAX and items[-1] is not _STOP:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                items.append(q.get(timeout=remaining))
+            except queue.Empty:
+                break
 
-    def _execute_heartbeat(self, triggered_by_event: bool = False) -> None:
+    def _execute_heartbeat(self, user_messages: List[str], triggered_by_event: bool = False) -> None:
         with self._lock:
             self.beat_count += 1
             self.state = AgentState.HEARTBEAT
             self.last_heartbeat = datetime.now()
             logger.info(f"Heartbeat #{self.beat_count} executing (triggered={triggered_by_event})")
 
-            user_messages = []
-            while not self._user_input_queue.empty():
-                try:
-                    user_messages.append(self._user_input_queue.get_nowait())
-                except queue.Empty:
-                    break
-
             for msg in user_messages:
                 self.memory.add_to_recall(Message(role="user", content=msg))
 
+            if self._is_local and not user_messages:
+                return  # Local models: skip idle heartbeats (no user input)
+
+            # System prompts are static (bar the cached status prefix) so the prompt
+            # prefix is byte-identical across beats; volatile state trails the context.
             if self._is_local:
-                status_block = self._build_status_block()
-                system_prompt = self.LOCAL_SYSTEM_PROMPT.format(
-                    timestamp=timestamp(), status_block=status_block
-                )
+                system_prompt = self.LOCAL_SYSTEM_PROMPT.format(status_block=self._status_prefix())
             else:
-                system_prompt = self.HEARTBEAT_SYSTEM_PROMPT.format(
-                    timestamp=timestamp(), beat_count=self.beat_count
-                )
+                system_prompt = self.HEARTBEAT_SYSTEM_PROMPT
             focus = user_messages[-1] if user_messages else None
             messages, _ = self.attention.build_context(system_prompt, focus)
+            messages.append(self._dynamic_state_msg())
 
             if user_messages:
                 if self._is_local:
@@ -171,8 +206,6 @@ Current time: {timestamp}
                     hint = "\n\n[PENDING USER INPUT]\n" + "\n".join(f"User: {m}" for m in user_messages)
                     messages.append(Message(role="user", content=f"Process these messages and respond.{hint}"))
             else:
-                if self._is_local:
-                    return  # Local models: skip idle heartbeats (no user input)
                 messages.append(Message(role="user", content="Heartbeat tick. Reflect and act if needed."))
 
             self.state = AgentState.THINKING
@@ -183,7 +216,7 @@ Current time: {timestamp}
                 logger.error(f"LLM call failed: {e}")
                 self._output_queue.put(("error", str(e)))
             except Exception as e:
-                logger.error(f"LLM call error: {e}\n{traceback.format_exc()}")
+                logger.error(f"LLM call error: {e}", exc_info=True)
                 self._output_queue.put(("error", str(e)))
 
             event = HeartbeatEvent(
@@ -209,9 +242,9 @@ Current time: {timestamp}
                 result = self.skills.execute(func_name, **func_args)
                 if not result.success:
                     logger.warning(f"Skill failed: {func_name} - {result.error}")
-                messages.append(Message(role="tool", content=json.dumps({
+                messages.append(Message(role="tool", content=json_dumps({
                     "name": func_name, "result": result.output if result.success else result.error
-                })))
+                }).decode()))
 
         if response.message.content and not response.message.tool_calls:
             self._output_queue.put(("message", response.message.content))
@@ -231,40 +264,67 @@ Current time: {timestamp}
         """Give heartbeat access to mindroot for status injection."""
         self.mindroot = mindroot
 
-    def _build_status_block(self) -> str:
-        """Build dynamic status info for local model context."""
+    def _dynamic_state_msg(self) -> Message:
+        return Message(role="system", content=f"Current: {timestamp()} | Heartbeat #{self.beat_count}")
+
+    def _status_prefix(self) -> str:
+        """Stable part of the status block; rebuilt only when mindroot state changes."""
+        mindroot = self.mindroot
+        version = (self.interval, id(mindroot), len(mindroot.thought_history) if mindroot else -1)
+        cached = self._status_prefix_cache
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
         lines = [
             "HEARTBEAT PROTOCOL (your life pulse):",
-            f"  My heartbeat count = {self.beat_count}",
-            f"  My heartbeat state = {self.state.name}",
             f"  Heartbeat interval = every {self.interval} seconds",
-            f"  Last beat at = {self.last_heartbeat.isoformat() if self.last_heartbeat else 'never'}",
         ]
-        if self.mindroot:
-            thoughts = self.mindroot.get_recent_thoughts(3)
-            lines.append(f"MINDROOT (my dream/thought generator):")
-            lines.append(f"  Mindroot is active = yes")
-            lines.append(f"  Total thoughts I have generated = {len(self.mindroot.thought_history)}")
+        if mindroot:
+            thoughts = mindroot.get_recent_thoughts(3)
+            lines.append("MINDROOT (my dream/thought generator):")
+            lines.append("  Mindroot is active = yes")
+            lines.append(f"  Total thoughts I have generated = {version[2]}")
             if thoughts:
-                lines.append(f"  My recent thoughts/dreams:")
-                for t in thoughts:
-                    lines.append(f"    Topic: {t.topic} -> \"{t.content}\"")
+                lines.append("  My recent thoughts/dreams:")
+                lines.extend(f"    Topic: {t.topic} -> \"{t.content}\"" for t in thoughts)
             else:
                 lines.append("  I have no thoughts yet.")
         else:
             lines.append("MINDROOT: not active")
-        return "\n".join(lines)
+        text = "\n".join(lines)
+        self._status_prefix_cache = (version, text)
+        return text
+
+    def _build_status_block(self) -> str:
+        """Build dynamic status info for local model context."""
+        return "\n".join((
+            self._status_prefix(),
+            "CURRENT HEARTBEAT:",
+            f"  My heartbeat count = {self.beat_count}",
+            f"  My heartbeat state = {self.state.name}",
+            f"  Last beat at = {self.last_heartbeat.isoformat() if self.last_heartbeat else 'never'}",
+        ))
 
     def _call_llm_chat(self, messages: List[Message]) -> ChatResponse:
-        chat_sig = inspect.signature(self.llm.chat)
         kwargs: Dict[str, Any] = {
             "model": self.model_name,
             "messages": messages,
-            "stream": False,
+            # Local models stream tokens to the output queue as they decode
+            "stream": self._is_local,
         }
         # Local models (Gemma etc.) don't support tool calling
         if not self._is_local:
             kwargs["tools"] = self.skills.get_tools_schema()
-        if "timeout_seconds" in chat_sig.parameters:
+        if self._llm_supports_timeout:
             kwargs["timeout_seconds"] = LOCAL_MODEL_TIMEOUT_SECONDS
-        return self.llm.chat(**kwargs)
\ No newline at end of file
+        response = self.llm.chat(**kwargs)
+        if not kwargs["stream"]:
+            return response
+
+        parts: List[str] = []
+        for chunk in response:
+            text = chunk.message.content
+            if text:
+                parts.append(text)
+                self._output_queue.put(("token", text))
+        return SimpleNamespace(message=SimpleNamespace(role="assistant", content="".join(parts), tool_calls=None))
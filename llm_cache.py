@@ -0,0 +1,139 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from config import MEMORY_PATH
+from Utils import json_dumps, json_loads
+
+logger = logging.getLogger(__name__)
+
+# ══════════════════════════════════════════════════════════════════════════════
+#  LLM RESPONSE CACHE
+# ══════════════════════════════════════════════════════════════════════════════
+# Exact-match cache for deterministic generations. Entries are keyed on the
+# fully merged prompt plus generation parameters; sampled calls bypass it.
+# Only generations that ended on EOS or max_new_tokens are stored, never ones
+# cut off by max_time. In practice the hits come from mindroot's fixed-topic
+# prompts: heartbeat prompts carry the timestamp and beat count, so they never
+# repeat (and must not be keyed without them, since the answer depends on them).
+
+
+class MemoryBackend:
+    """In-process LRU store of (created_at, response) pairs."""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[float, str]]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+            return entry
+
+    def set(self, key: str, created_at: float, value: str) -> None:
+        with self._lock:
+            self._data[key] = (created_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class FileBackend:
+    """One JSON file per entry; survives restarts."""
+
+    def __init__(self, directory: Optional[Path] = None):
+        self.directory = Path(directory) if directory else MEMORY_PATH / "llm_cache"
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Tuple[float, str]]:
+        try:
+            with open(self._path(key), 'rb') as f:
+                data = json_loads(f.read())
+            return data["created_at"], data["value"]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Corrupt LLM cache entry {key}: {e}")
+            return None
+
+    def set(self, key: str, created_at: float, value: str) -> None:
+        try:
+            with open(self._path(key), 'wb') as f:
+                f.write(json_dumps({"created_at": created_at, "value": value}))
+        except OSError as e:
+            logger.warning(f"Failed to write LLM cache entry: {e}")
+
+    def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        for f in self.directory.glob("*.json"):
+            f.unlink(missing_ok=True)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.directory.glob("*.json"))
+
+
+class LLMCache:
+    """TTL cache of generated responses, bypassed for sampled (temperature > 0) calls."""
+
+    def __init__(self, backend=None, ttl_seconds: float = 3600):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.ttl_seconds = ttl_seconds
+        self.stats = {"hits": 0, "misses": 0, "bypassed": 0}
+
+    @staticmethod
+    def cache_key(model: str, messages: List[Dict[str, str]], temperature: float,
+                  max_new_tokens: int, tools: Optional[List[Any]] = None,
+                  max_time: Optional[float] = None) -> str:
+        payload = json_dumps({
+            "model": model, "messages": messages, "temperature": temperature,
+            "max_new_tokens": max_new_tokens, "max_time": max_time, "tools": tools,
+        }, default=str)
+        return hashlib.sha256(payload).hexdigest()
+
+    def is_cacheable(self, temperature: float) -> bool:
+        if temperature > 0:
+            self.stats["bypassed"] += 1
+            return False
+        return True
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self.backend.get(key)
+        if entry is not None:
+            created_at, value = entry
+            if time.time() - created_at <= self.ttl_seconds:
+                self.stats["hits"] += 1
+                return value
+            self.backend.delete(key)
+        self.stats["misses"] += 1
+        return None
+
+    def set(self, key: str, value: str) -> None:
+        self.backend.set(key, time.time(), value)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "entries": len(self.backend), "ttl_seconds": self.ttl_seconds}
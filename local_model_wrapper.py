@@ -1,11 +1,14 @@
 import json
 import logging
+import threading
 from pathlib import Path
 from types import SimpleNamespace
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterator
 import torch
-from transformers import AutoTokenizer, AutoModelForCausalLM, BitsAndBytesConfig
+from transformers import AutoTokenizer, AutoModelForCausalLM, BitsAndBytesConfig, TextIteratorStreamer
 from colorama import Fore, Style
+from config import DEFAULT_QUANT, DEFAULT_TEMPERATURE
+from llm_cache import LLMCache, MemoryBackend
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +19,52 @@ def c(text: str, color: str = "") -> str:
     reset = getattr(Style, 'RESET_ALL', '')
     return f"{color}{text}{reset}"
 
+def _merge_messages(chat_messages: List[Any]) -> List[Dict[str, str]]:
+    """
+    Gemma (and some other models) don't support the "system" role and require
+    strict user/assistant alternation, starting with a user turn. In one pass:
+    system messages are held back and prepended to the next user message, tool
+    results become user messages, and consecutive same-role messages collapse.
+    """
+    roles: List[str] = []
+    chunks: List[List[str]] = []
+    pending_system: List[str] = []
+    for msg in chat_messages:
+        role = msg.get("role", "user") if isinstance(msg, dict) else getattr(msg, "role", "user")
+        content = msg.get("content", "") if isinstance(msg, dict) else getattr(msg, "content", "")
+        if role == "system":
+            pending_system.append(content)
+            continue
+        if role == "tool":
+            role = "user"
+            content = f"[Tool result] {content}"
+        if pending_system and role == "user":
+            content = "\n".join(pending_system) + "\n\n" + content
+            pending_system.clear()
+        if roles and roles[-1] == role:
+            chunks[-1].append(content)
+            continue
+        if not roles and role != "user":
+            roles.append("user")
+            chunks.append(["(start)"])
+        roles.append(role)
+        chunks.append([content])
+    # Flush remaining system content
+    if pending_system:
+        text = "\n".join(pending_system)
+        if roles and roles[-1] == "user":
+            chunks[-1].append(text)
+        else:
+            roles.append("user")
+            chunks.append([text])
+    if not roles:
+        return [{"role": "user", "content": ""}]
+    return [{"role": role, "content": "\n".join(parts)} for role, parts in zip(roles, chunks)]
+
+def _response(content: str) -> SimpleNamespace:
+    """Dot-accessible object that mirrors ollama's ChatResponse."""
+    return SimpleNamespace(message=SimpleNamespace(role="assistant", content=content, tool_calls=None))
+
 # ══════════════════════════════════════════════════════════════════════════════
 #  LOCAL MODEL WRAPPER (HUGGING FACE TRANSFORMERS)
 # ══════════════════════════════════════════════════════════════════════════════
@@ -24,9 +73,11 @@ def c(text: str, color: str = "") -> str:
 class LocalModel:
     """Wrapper for Hugging Face Transformers model (like Gemma)."""
 
-    def __init__(self, model_path: str, device: str = "auto", quantize: bool = True):
+    def __init__(self, model_path: str, device: str = "auto", quant: str = DEFAULT_QUANT,
+                 compile_model: bool = False, temperature: float = DEFAULT_TEMPERATURE):
         self.logger = logging.getLogger(__name__)
         self.model_path = Path(model_path)
+        self.temperature = temperature
         print(c(f"[Nexuss] Loading model from {self.model_path}...", Fore.CYAN))
 
         has_cuda = torch.cuda.is_available()
@@ -38,29 +89,64 @@ class LocalModel:
             print(c("[Nexuss] No GPU detected — using CPU (slower)", Fore.YELLOW))
 
         self.tokenizer = AutoTokenizer.from_pretrained(self.model_path)
+        if not self.tokenizer.is_fast:
+            self.logger.warning("No fast (Rust) tokenizer for this model; tokenization will be slower")
 
         load_kwargs: Dict[str, Any] = {"device_map": device}
 
-        if has_cuda and quantize:
-            # 4-bit quantization: fits 2B models in ~1.2GB VRAM
+        if has_cuda and quant == "nf4":
+            # 4-bit quantization: fits 2B models in ~1.2GB VRAM.
+            # bfloat16 compute needs Ampere+; older cards (GTX 16xx) stay on float16.
+            compute_dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
             print(c("[Nexuss] Using 4-bit quantization (NF4) for speed", Fore.YELLOW))
             load_kwargs["quantization_config"] = BitsAndBytesConfig(
                 load_in_4bit=True,
-                bnb_4bit_compute_dtype=torch.float16,
+                bnb_4bit_compute_dtype=compute_dtype,
                 bnb_4bit_quant_type="nf4",
+                bnb_4bit_use_double_quant=True,
             )
+            self.quantization = "4-bit NF4"
+        elif has_cuda and quant == "int8":
+            print(c("[Nexuss] Using 8-bit quantization (LLM.int8)", Fore.YELLOW))
+            load_kwargs["quantization_config"] = BitsAndBytesConfig(load_in_8bit=True)
+            self.quantization = "8-bit"
         elif has_cuda:
             # float16 — native on GTX 1650+
             load_kwargs["torch_dtype"] = torch.float16
+            self.quantization = "None (float16)"
         else:
             load_kwargs["torch_dtype"] = torch.float32
+            self.quantization = "None (float32)"
 
         self.model = AutoModelForCausalLM.from_pretrained(self.model_path, **load_kwargs)
         self.model.eval()
 
+        self.compiled = False
+        if compile_model and has_cuda:
+            # Compile forward() only, so generate() and the HF attributes stay intact
+            try:
+                self.model.forward = torch.compile(self.model.forward, mode="reduce-overhead", fullgraph=False)
+                self.compiled = True
+                print(c("[Nexuss] Model forward compiled with torch.compile", Fore.YELLOW))
+            except Exception as e:
+                self.logger.warning(f"torch.compile unavailable, running eager: {e}")
+
         device_used = next(self.model.parameters()).device
         print(c(f"[Nexuss] Model loaded on {device_used}!", Fore.GREEN))
 
+        self._cache = LLMCache(MemoryBackend(max_entries=512), ttl_seconds=3600)
+
+        # KV cache of the previous turn, reused for the longest shared token prefix.
+        # chat() is called from the heartbeat and mindroot threads, so serialize it.
+        self._lock = threading.Lock()
+        self._kv_cache = None
+        self._cached_ids: Optional[torch.Tensor] = None
+        self._cached_template = self.tokenizer.chat_template
+        self._max_positions = getattr(self.model.config, "max_position_embeddings", None)
+        eos = self.model.generation_config.eos_token_id
+        self._eos_ids = frozenset(eos if isinstance(eos, (list, tuple)) else (eos,)) | {self.tokenizer.eos_token_id}
+        self._pinned_buf: Optional[torch.Tensor] = None
+
     def chat(
         self,
         model: Optional[str] = None,
@@ -68,80 +154,166 @@ class LocalModel:
         tools: Optional[List[Any]] = None,
         stream: bool = False,
         timeout_seconds: Optional[float] = None,
+        temperature: Optional[float] = None,
     ) -> Dict:
         """
         Mimics the structure of ollama.Client.chat response.
         messages: list of dict with 'role' and 'content'.
         returns a dict with a 'message' field containing 'role' and 'content'.
+        With stream=True, returns an iterator of such chunks as tokens are decoded.
+        temperature defaults to the one the model was loaded with.
         """
-        chat_messages = messages or []
-
-        # Gemma (and some other models) don't support the "system" role
-        # and require strict user/assistant alternation.
-        # 1) Merge system messages into the next user message.
-        # 2) Collapse consecutive same-role messages.
-        merged: List[Dict[str, str]] = []
-        system_buf: List[str] = []
-        for msg in chat_messages:
-            role = msg.get("role", "user") if isinstance(msg, dict) else getattr(msg, "role", "user")
-            content = msg.get("content", "") if isinstance(msg, dict) else getattr(msg, "content", "")
-            if role == "system":
-                system_buf.append(content)
-                continue
-            if role == "tool":
-                role = "user"
-                content = f"[Tool result] {content}"
-            if system_buf and role == "user":
-                content = "\n".join(system_buf) + "\n\n" + content
-                system_buf.clear()
-            # Collapse consecutive same-role messages
-            if merged and merged[-1]["role"] == role:
-                merged[-1]["content"] += "\n" + content
-            else:
-                merged.append({"role": role, "content": content})
-        # Flush remaining system content
-        if system_buf:
-            text = "\n".join(system_buf)
-            if merged and merged[-1]["role"] == "user":
-                merged[-1]["content"] += "\n" + text
-            else:
-                merged.append({"role": "user", "content": text})
-        if not merged:
-            merged.append({"role": "user", "content": ""})
-        # Gemma requires the conversation to start with a user turn
-        if merged[0]["role"] != "user":
-            merged.insert(0, {"role": "user", "content": "(start)"})
-        # Ensure alternation: if two same roles are adjacent, merge them
-        final: List[Dict[str, str]] = [merged[0]]
-        for m in merged[1:]:
-            if m["role"] == final[-1]["role"]:
-                final[-1]["content"] += "\n" + m["content"]
-            else:
-                final.append(m)
-
-        prompt = self.tokenizer.apply_chat_template(
-            final,
-            tokenize=False,
-            add_generation_prompt=True
-        )
-        inputs = self.tokenizer(prompt, return_tensors="pt").to(self.model.device)
+        if temperature is None:
+            temperature = self.temperature
+        final = _merge_messages(messages or [])
 
         gen_kwargs: Dict[str, Any] = {
             "max_new_tokens": 512,
-            "temperature": 0.7,
-            "do_sample": True,
+            "do_sample": temperature > 0,
             "pad_token_id": self.tokenizer.eos_token_id,
         }
+        if temperature > 0:
+            gen_kwargs["temperature"] = temperature
         if timeout_seconds is not None:
             gen_kwargs["max_time"] = timeout_seconds
 
-        logger.info("LocalModel.chat() generating response...")
-        with torch.no_grad():
-            outputs = self.model.generate(**inputs, **gen_kwargs)
-        logger.info("LocalModel.chat() generation complete.")
+        cache_key = None
+        if self._cache.is_cacheable(temperature):
+            cache_key = self._cache.cache_key(
+                str(self.model_path), final, temperature, gen_kwargs["max_new_tokens"], tools,
+                timeout_seconds,
+            )
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                logger.info("LocalModel.chat() served from response cache.")
+                response = _response(cached)
+                return iter((response,)) if stream else response
+
+        prompt = self.tokenizer.apply_chat_template(
+            final,
+            tokenize=False,
+            add_generation_prompt=True
+        )
+        # The chat template already emits BOS/special tokens; don't add them twice
+        input_ids = self.tokenizer(prompt, return_tensors="pt", add_special_tokens=False).input_ids
+
+        if stream:
+            return self._stream(input_ids, gen_kwargs, cache_key)
+
+        input_len = input_ids.shape[1]
+        outputs = self._generate(input_ids, gen_kwargs)
+        response_text = self.tokenizer.decode(outputs.sequences[0][input_len:], skip_special_tokens=True)
+        if cache_key is not None and self._finished(outputs.sequences[0], input_len, gen_kwargs):
+            self._cache.set(cache_key, response_text)
+        return _response(response_text)
+
+    def _to_device(self, input_ids: torch.Tensor) -> torch.Tensor:
+        """Move prompt ids to the model device, staging CUDA copies through a reused pinned buffer."""
+        device = self.model.device
+        if device.type != "cuda":
+            return input_ids.to(device)
+        n = input_ids.shape[1]
+        if self._pinned_buf is None or self._pinned_buf.numel() < n:
+            capacity = max(n, 2 * (self._pinned_buf.numel() if self._pinned_buf is not None else 0), 1024)
+            self._pinned_buf = torch.empty(capacity, dtype=torch.long, pin_memory=True)
+        staged = self._pinned_buf[:n]
+        staged.copy_(input_ids[0])
+        return staged.to(device, non_blocking=True).unsqueeze(0)
+
+    def _generate(self, input_ids: torch.Tensor, gen_kwargs: Dict[str, Any]):
+        # Called with CPU ids; the pinned buffer and KV cache are shared state
+        with self._lock:
+            input_ids = self._to_device(input_ids)
+            past = self._reuse_kv_cache(input_ids[0])
+            if past is not None:
+                gen_kwargs["past_key_values"] = past
+
+            logger.info("LocalModel.chat() generating response...")
+            with torch.no_grad():
+                outputs = self.model.generate(
+                    input_ids=input_ids, attention_mask=torch.ones_like(input_ids),
+                    **gen_kwargs, use_cache=True, return_dict_in_generate=True
+                )
+            logger.info("LocalModel.chat() generation complete.")
+            self._store_kv_cache(outputs)
+        return outputs
 
-        response_text = self.tokenizer.decode(outputs[0][inputs.input_ids.shape[1]:], skip_special_tokens=True)
+    def _finished(self, sequence: torch.Tensor, input_len: int, gen_kwargs: Dict[str, Any]) -> bool:
+        """True if generation ended on EOS or max_new_tokens, not on the max_time cutoff."""
+        generated = sequence.shape[-1] - input_len
+        if generated >= gen_kwargs["max_new_tokens"]:
+            return True
+        return generated > 0 and int(sequence[-1]) in self._eos_ids
 
-        # Return a dot-accessible object that mirrors ollama's ChatResponse
-        msg_obj = SimpleNamespace(role="assistant", content=response_text, tool_calls=None)
-        return SimpleNamespace(message=msg_obj)
\ No newline at end of file
+    def _stream(self, input_ids: torch.Tensor, gen_kwargs: Dict[str, Any], cache_key: Optional[str]) -> Iterator[SimpleNamespace]:
+        streamer = TextIteratorStreamer(self.tokenizer, skip_prompt=True, skip_special_tokens=True)
+        gen_kwargs["streamer"] = streamer
+        error: List[BaseException] = []
+        result: List[Any] = []
+
+        def _run() -> None:
+            try:
+                result.append(self._generate(input_ids, gen_kwargs))
+            except BaseException as e:
+                error.append(e)
+                streamer.end()  # Unblock the consumer
+
+        worker = threading.Thread(target=_run, daemon=True, name="LocalModelGenerate")
+        worker.start()
+        parts: List[str] = []
+        for chunk in streamer:
+            if chunk:
+                parts.append(chunk)
+                yield _response(chunk)
+        worker.join()
+        if error:
+            raise error[0]
+        if cache_key is not None and self._finished(result[0].sequences[0], input_ids.shape[1], gen_kwargs):
+            self._cache.set(cache_key, "".join(parts))
+
+    def _reuse_kv_cache(self, input_ids: torch.Tensor):
+        """Crop the previous turn's KV cache to the prefix it shares with input_ids."""
+        cache, cached_ids = self._kv_cache, self._cached_ids
+        self._kv_cache = self._cached_ids = None
+        if cache is None or not hasattr(cache, "crop"):
+            return None
+        if self.tokenizer.chat_template != self._cached_template:
+            self._cached_template = self.tokenizer.chat_template
+            return None
+
+        n = min(cached_ids.shape[0], input_ids.shape[0])
+        mismatch = (cached_ids[:n] != input_ids[:n]).nonzero()
+        if mismatch.numel():
+            n = int(mismatch[0])
+        # Leave at least one token for generate() to prefill; never exceed what is cached
+        n = min(n, input_ids.shape[0] - 1, cache.get_seq_length())
+        if n <= 0:
+            return None
+        cache.crop(n)
+        return cache
+
+    def _store_kv_cache(self, outputs) -> None:
+        cache = outputs.past_key_values
+        if cache is None or (self._max_positions and cache.get_seq_length() >= self._max_positions):
+            return
+        self._kv_cache = cache
+        self._cached_ids = outputs.sequences[0]
+
+    def embed(self, text: str) -> List[float]:
+        """Mean-pooled last hidden state, used as a cheap sentence embedding."""
+        input_ids = self.tokenizer(text, return_tensors="pt").input_ids
+        with self._lock, torch.no_grad():
+            out = self.model(input_ids=self._to_device(input_ids), output_hidden_states=True)
+        return out.hidden_states[-1][0].mean(dim=0).float().cpu().tolist()
+
+    def get_status(self) -> Dict[str, Any]:
+        # Unlocked read: generation clears _kv_cache concurrently, so read it once
+        cache = self._kv_cache
+        return {
+            "model_path": str(self.model_path),
+            "device": str(self.model.device),
+            "quantization": self.quantization,
+            "compiled": self.compiled,
+            "response_cache": self._cache.get_stats(),
+            "kv_cached_tokens": cache.get_seq_length() if cache is not None else 0,
+        }
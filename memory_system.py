@@ -1,17 +1,190 @@
+import atexit
+import queue
 import threading
 import time
-import json
 import logging
+import re
+import sqlite3
 from pathlib import Path
 from collections import deque
-from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby, islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
+import numpy as np
 from ollama import Message
-from config import RECALL_MEMORY_LIMIT, CORE_MEMORY_LIMIT, ARCHIVAL_SEARCH_LIMIT, MEMORY_PATH, ARCHIVAL_PATH
+from config import RECALL_MEMORY_LIMIT, CORE_MEMORY_LIMIT, ARCHIVAL_SEARCH_LIMIT, MEMORY_PATH, ARCHIVAL_PATH, ARCHIVAL_DB_PATH
 from enums_and_dataclasses import MemoryBlock, MemoryType
-from Utils import timestamp, hash_content, truncate
+from Utils import timestamp, hash_content, truncate, estimate_tokens, json_dumps, json_loads
 
 logger = logging.getLogger(__name__)
 
+_WORD_RE = re.compile(r"\w+")
+
+
+def _tokenize(text: str) -> frozenset:
+    return frozenset(_WORD_RE.findall(text.lower()))
+
+
+_ARCHIVAL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS archival (
+    id TEXT PRIMARY KEY,
+    content TEXT NOT NULL,
+    tags TEXT NOT NULL DEFAULT '[]',
+    importance REAL NOT NULL DEFAULT 0.5,
+    created_at TEXT,
+    updated_at TEXT,
+    access_count INTEGER NOT NULL DEFAULT 0
+)
+"""
+_ARCHIVAL_UPSERT = "INSERT OR REPLACE INTO archival VALUES (?, ?, ?, ?, ?, ?, ?)"
+_ARCHIVAL_DELETE = "DELETE FROM archival WHERE id = ?"
+
+_WRITER_STOP = object()
+
+
+def _load_legacy_block(arch_file: Path) -> Optional[MemoryBlock]:
+    try:
+        with open(arch_file, "rb") as f:
+            data = json_loads(f.read())
+        return MemoryBlock(
+            id=data["id"], content=data["content"],
+            memory_type=MemoryType.ARCHIVAL,
+            created_at=data.get("created_at", timestamp()),
+            updated_at=data.get("updated_at", timestamp()),
+            importance=data.get("importance", 0.5),
+            access_count=data.get("access_count", 0),
+            tags=data.get("tags", [])
+        )
+    except Exception as e:
+        logger.error(f"Failed to load archival {arch_file}: {e}")
+        return None
+
+
+def _archival_row(block: MemoryBlock) -> tuple:
+    return (block.id, block.content, json_dumps(block.tags).decode(), block.importance,
+            block.created_at, block.updated_at, block.access_count)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#  ARCHIVAL STORE
+# ══════════════════════════════════════════════════════════════════════════════
+class ArchivalStore:
+    """Column-oriented archival storage: one list/array per MemoryBlock field.
+
+    Rows are addressed by position; deletes swap the last row into the hole so
+    every column stays dense. MemoryBlock objects are only built for rows that
+    are handed back to callers. Search goes through an inverted index
+    (word -> block ids) so blocks sharing no word with the query are never touched.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.ids: List[str] = []
+        self.contents: List[str] = []
+        self.token_sets: List[frozenset] = []
+        self.tags: List[List[str]] = []
+        self.tag_sets: List[frozenset] = []
+        self.created_at: List[str] = []
+        self.updated_at: List[str] = []
+        self.importance = np.zeros(capacity, dtype=np.float64)
+        self.access = np.zeros(capacity, dtype=np.int32)
+        self._rows: Dict[str, int] = {}
+        self._postings: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, block_id: str) -> bool:
+        return block_id in self._rows
+
+    def add(self, block: MemoryBlock) -> None:
+        if block.id in self._rows:
+            self.remove(block.id)
+        row = len(self.ids)
+        if row == len(self.importance):
+            self.importance = np.resize(self.importance, max(row * 2, 64))
+            self.access = np.resize(self.access, max(row * 2, 64))
+        self._rows[block.id] = row
+        self.ids.append(block.id)
+        self.contents.append(block.content)
+        tokens = _tokenize(block.content)
+        self.token_sets.append(tokens)
+        for word in tokens:
+            self._postings.setdefault(word, set()).add(block.id)
+        self.tags.append(list(block.tags))
+        self.tag_sets.append(frozenset(block.tags))
+        self.created_at.append(block.created_at)
+        self.updated_at.append(block.updated_at)
+        self.importance[row] = block.importance
+        self.access[row] = block.access_count
+
+    def remove(self, block_id: str) -> bool:
+        row = self._rows.pop(block_id, None)
+        if row is None:
+            return False
+        for word in self.token_sets[row]:
+            ids = self._postings[word]
+            ids.discard(block_id)
+            if not ids:
+                del self._postings[word]
+        last = len(self.ids) - 1
+        if row != last:
+            for col in (self.ids, self.contents, self.token_sets,
+                        self.tags, self.tag_sets, self.created_at, self.updated_at):
+                col[row] = col[last]
+            self.importance[row] = self.importance[last]
+            self.access[row] = self.access[last]
+            self._rows[self.ids[row]] = row
+        for col in (self.ids, self.contents, self.token_sets,
+                    self.tags, self.tag_sets, self.created_at, self.updated_at):
+            col.pop()
+        return True
+
+    def get(self, block_id: str) -> Optional[MemoryBlock]:
+        row = self._rows.get(block_id)
+        return None if row is None else self._block(row)
+
+    def _block(self, row: int) -> MemoryBlock:
+        return MemoryBlock(
+            id=self.ids[row], content=self.contents[row],
+            memory_type=MemoryType.ARCHIVAL,
+            created_at=self.created_at[row], updated_at=self.updated_at[row],
+            importance=float(self.importance[row]),
+            access_count=int(self.access[row]),
+            tags=list(self.tags[row])
+        )
+
+    def search(self, query: str, limit: int, tags: Optional[List[str]] = None) -> List[MemoryBlock]:
+        n = len(self.ids)
+        if n == 0 or limit <= 0:
+            return []
+        # score = |query words ∩ block words|, accumulated over posting lists
+        scores = np.zeros(n, dtype=np.int32)
+        rows = self._rows
+        for word in _tokenize(query):
+            ids = self._postings.get(word)
+            if ids:
+                scores[np.fromiter((rows[i] for i in ids), dtype=np.intp, count=len(ids))] += 1
+        if tags:
+            wanted = frozenset(tags)
+            tag_mask = np.fromiter((not t.isdisjoint(wanted) for t in self.tag_sets), dtype=bool, count=n)
+            scores[~tag_mask] = 0
+        hits = np.flatnonzero(scores)
+        if hits.size == 0:
+            return []
+        self.access[hits] += 1
+
+        # Rank by (score, importance): scores are integers, so scaling them by
+        # the importance spread keeps every score bucket strictly ordered.
+        imp = self.importance[hits]
+        imp -= imp.min()
+        key = scores[hits] * (imp.max() + 1.0) + imp
+        if hits.size > limit:
+            top = np.argpartition(-key, limit - 1)[:limit]
+        else:
+            top = np.arange(hits.size)
+        top = top[np.argsort(-key[top], kind="stable")]
+        return [self._block(int(r)) for r in hits[top]]
+
 
 # ══════════════════════════════════════════════════════════════════════════════
 #  MEMORY SYSTEM
@@ -23,24 +196,40 @@ class MemoryManager:
         self.agent_id = agent_id
         self.core: Dict[str, MemoryBlock] = {}
         self.recall: deque[Message] = deque(maxlen=RECALL_MEMORY_LIMIT)
-        self.archival_index: Dict[str, MemoryBlock] = {}
+        self.archival = ArchivalStore()
         self._lock = threading.RLock()
+        self._core_cache: Optional[Tuple[str, int]] = None
+        self._core_reads = 0  # Core reads not yet folded into block access counts
+        self._db = self._open_archival_db()
         self._load_persistent_memory()
+        self._core_chars = sum(len(b.content) for b in self.core.values())
+
+        # Persistence runs on a single writer thread; mutators only enqueue
+        self._write_q: queue.Queue = queue.Queue()
+        self._writer = threading.Thread(target=self._writer_loop, daemon=True, name="MemoryWriter")
+        self._writer.start()
+        atexit.register(self.close)
 
     def get_core_memory(self) -> str:
+        return self.get_core_memory_with_tokens()[0]
+
+    def get_core_memory_with_tokens(self) -> Tuple[str, int]:
+        """Rendered core memory and its token estimate, cached until the next core write."""
         with self._lock:
-            parts = []
-            for key, block in self.core.items():
-                parts.append(f"[{key.upper()}]\n{block.content}")
-                block.access_count += 1
-            return "\n\n".join(parts)
+            self._core_reads += 1
+            if self._core_cache is None:
+                content = "\n\n".join(f"[{key.upper()}]\n{block.content}" for key, block in self.core.items())
+                self._core_cache = (content, estimate_tokens(content))
+            return self._core_cache
 
     def update_core_memory(self, key: str, content: str) -> bool:
         with self._lock:
-            total_len = sum(len(b.content) for k, b in self.core.items() if k != key)
-            if total_len + len(content) > CORE_MEMORY_LIMIT:
+            old_len = len(self.core[key].content) if key in self.core else 0
+            if self._core_chars - old_len + len(content) > CORE_MEMORY_LIMIT:
                 logger.warning(f"Core memory limit exceeded for '{key}'")
                 return False
+            self._flush_core_reads()
+            self._core_chars += len(content) - old_len
             if key in self.core:
                 self.core[key].content = content
                 self.core[key].updated_at = timestamp()
@@ -49,6 +238,7 @@ class MemoryManager:
                     id=f"core_{key}_{hash_content(content)}",
                     content=content, memory_type=MemoryType.CORE, importance=1.0
                 )
+            self._core_cache = None
             self._save_core_memory()
             logger.info(f"Core memory updated: {key}")
             return True
@@ -56,7 +246,9 @@ class MemoryManager:
     def delete_core_memory(self, key: str) -> bool:
         with self._lock:
             if key in self.core:
-                del self.core[key]
+                self._flush_core_reads()
+                self._core_chars -= len(self.core.pop(key).content)
+                self._core_cache = None
                 self._save_core_memory()
                 return True
             return False
@@ -67,77 +259,163 @@ class MemoryManager:
 
     def get_recall_messages(self, limit: Optional[int] = None) -> List[Message]:
         with self._lock:
-            msgs = list(self.recall)
-            return msgs[-limit:] if limit else msgs
+            n = len(self.recall)
+            if not limit or limit >= n:
+                return list(self.recall)
+            # Walk only the tail instead of copying the whole buffer
+            tail = list(islice(reversed(self.recall), limit))
+        tail.reverse()
+        return tail
+
+    def iter_recall(self, limit: Optional[int] = None) -> Iterator[Message]:
+        """Oldest-first iterator over a snapshot of the last `limit` recall messages."""
+        return iter(self.get_recall_messages(limit))
+
+    def iter_recall_reversed(self, limit: Optional[int] = None) -> Iterator[Message]:
+        """Newest-first iterator over a snapshot of the recall buffer."""
+        with self._lock:
+            snapshot = self.recall.copy()
+        return islice(reversed(snapshot), limit)
 
     def clear_recall(self) -> None:
         with self._lock:
             self.recall.clear()
 
     def add_to_archival(self, content: str, tags: Optional[List[str]] = None, importance: float = 0.5) -> str:
+        # Hashing touches only the new content; keep it outside the lock
+        block_id = f"arch_{hash_content(content)}_{int(time.time())}"
+        block = MemoryBlock(
+            id=block_id, content=content, memory_type=MemoryType.ARCHIVAL,
+            tags=tags or [], importance=importance
+        )
         with self._lock:
-            block_id = f"arch_{hash_content(content)}_{int(time.time())}"
-            block = MemoryBlock(
-                id=block_id, content=content, memory_type=MemoryType.ARCHIVAL,
-                tags=tags or [], importance=importance
-            )
-            self.archival_index[block_id] = block
+            self.archival.add(block)
             self._save_archival_block(block)
             logger.info(f"Archival added: {truncate(content, 50)}")
             return block_id
 
     def search_archival(self, query: str, limit: int = ARCHIVAL_SEARCH_LIMIT, tags: Optional[List[str]] = None) -> List[MemoryBlock]:
         with self._lock:
-            results = []
-            query_lower = query.lower()
-            query_words = set(query_lower.split())
-            for block in self.archival_index.values():
-                if tags and not any(t in block.tags for t in tags):
-                    continue
-                content_lower = block.content.lower()
-                score = sum(1 for w in query_words if w in content_lower)
-                if score > 0:
-                    block.access_count += 1
-                    results.append((score, block))
-            results.sort(key=lambda x: (x[0], x[1].importance), reverse=True)
-            return [r[1] for r in results[:limit]]
+            return self.archival.search(query, limit, tags)
 
     def delete_archival(self, block_id: str) -> bool:
         with self._lock:
-            if block_id in self.archival_index:
-                del self.archival_index[block_id]
-                arch_file = ARCHIVAL_PATH / f"{block_id}.json"
-                if arch_file.exists():
-                    arch_file.unlink()
+            if self.archival.remove(block_id):
+                self._write_q.put(("sql", _ARCHIVAL_DELETE, (block_id,)))
                 return True
             return False
 
     def get_memory_stats(self) -> Dict[str, int]:
         with self._lock:
             return {
-                "core_characters": sum(len(b.content) for b in self.core.values()),
+                "core_characters": self._core_chars,
                 "core_limit": CORE_MEMORY_LIMIT,
                 "recall_messages": len(self.recall),
                 "recall_limit": RECALL_MEMORY_LIMIT,
-                "archival_blocks": len(self.archival_index),
+                "archival_blocks": len(self.archival),
             }
 
+    def close(self) -> None:
+        """Flush pending writes and stop the writer thread."""
+        if self._writer.is_alive():
+            with self._lock:
+                if self._core_reads and self.core:
+                    self._save_core_memory()
+            self._write_q.put(_WRITER_STOP)
+            self._writer.join(timeout=10.0)
+        self._db.close()
+
+    def _writer_loop(self) -> None:
+        q = self._write_q
+        while True:
+            batch = [q.get()]
+            while True:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            stop = False
+            files: Dict[Path, bytes] = {}
+            statements: List[Tuple[str, tuple]] = []
+            for item in batch:
+                if item is _WRITER_STOP:
+                    stop = True
+                    continue
+                kind, target, payload = item
+                if kind == "file":
+                    files[target] = payload  # Only the newest snapshot of a file matters
+                else:
+                    statements.append((target, payload))
+
+            for path, data in files.items():
+                try:
+                    tmp = path.with_suffix(".tmp")
+                    tmp.write_bytes(data)
+                    tmp.replace(path)
+                except OSError as e:
+                    logger.error(f"Failed to write {path}: {e}")
+            if statements:
+                try:
+                    with self._db:
+                        for sql, group in groupby(statements, key=lambda st: st[0]):
+                            self._db.executemany(sql, [params for _, params in group])
+                except sqlite3.Error as e:
+                    logger.error(f"Failed to write archival database: {e}")
+            if stop:
+                return
+
+    def _flush_core_reads(self) -> None:
+        """Fold batched core reads into each block's access count (caller holds the lock)."""
+        if self._core_reads:
+            for block in self.core.values():
+                block.access_count += self._core_reads
+            self._core_reads = 0
+
     def _save_core_memory(self) -> None:
+        self._flush_core_reads()
         core_file = MEMORY_PATH / f"{self.agent_id}_core.json"
-        with open(core_file, "w", encoding="utf-8") as f:
-            json.dump({k: v.to_dict() for k, v in self.core.items()}, f, indent=2)
+        data = json_dumps({k: v.to_dict() for k, v in self.core.items()}, indent=True)
+        self._write_q.put(("file", core_file, data))
+
+    def _open_archival_db(self) -> sqlite3.Connection:
+        # Used by __init__ while loading, then only by the writer thread
+        db = sqlite3.connect(ARCHIVAL_DB_PATH, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute(_ARCHIVAL_SCHEMA)
+        db.commit()
+        return db
 
     def _save_archival_block(self, block: MemoryBlock) -> None:
-        arch_file = ARCHIVAL_PATH / f"{block.id}.json"
-        with open(arch_file, "w", encoding="utf-8") as f:
-            json.dump(block.to_dict(), f, indent=2)
+        self._write_q.put(("sql", _ARCHIVAL_UPSERT, _archival_row(block)))
+
+    def _migrate_legacy_archival(self) -> None:
+        """Move pre-SQLite arch_*.json blocks into the database."""
+        legacy = list(ARCHIVAL_PATH.glob("arch_*.json"))
+        if not legacy:
+            return
+        # Files are independent and decoding is mostly I/O; read them concurrently
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            blocks = list(pool.map(_load_legacy_block, legacy))
+        migrated, rows = [], []
+        for arch_file, block in zip(legacy, blocks):
+            if block is None:
+                continue
+            self.archival.add(block)
+            rows.append(_archival_row(block))
+            migrated.append(arch_file)
+        with self._db:
+            self._db.executemany(_ARCHIVAL_UPSERT, rows)
+        for arch_file in migrated:
+            arch_file.unlink(missing_ok=True)
+        logger.info(f"Migrated {len(migrated)} archival blocks to {ARCHIVAL_DB_PATH.name}")
 
     def _load_persistent_memory(self) -> None:
         core_file = MEMORY_PATH / f"{self.agent_id}_core.json"
         if core_file.exists():
             try:
-                with open(core_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
+                with open(core_file, "rb") as f:
+                    data = json_loads(f.read())
                     for key, val in data.items():
                         self.core[key] = MemoryBlock(
                             id=val["id"], content=val["content"],
@@ -152,22 +430,19 @@ class MemoryManager:
             except Exception as e:
                 logger.error(f"Failed to load core memory: {e}")
 
-        for arch_file in ARCHIVAL_PATH.glob("arch_*.json"):
-            try:
-                with open(arch_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    block = MemoryBlock(
-                        id=data["id"], content=data["content"],
-                        memory_type=MemoryType.ARCHIVAL,
-                        created_at=data.get("created_at", timestamp()),
-                        updated_at=data.get("updated_at", timestamp()),
-                        importance=data.get("importance", 0.5),
-                        access_count=data.get("access_count", 0),
-                        tags=data.get("tags", [])
-                    )
-                    self.archival_index[block.id] = block
-            except Exception as e:
-                logger.error(f"Failed to load archival {arch_file}: {e}")
-        logger.info(f"Loaded {len(self.archival_index)} archival blocks")
+        try:
+            rows = self._db.execute(
+                "SELECT id, content, tags, importance, created_at, updated_at, access_count FROM archival"
+            )
+            for block_id, content, tags, importance, created_at, updated_at, access_count in rows:
+                self.archival.add(MemoryBlock(
+                    id=block_id, content=content, memory_type=MemoryType.ARCHIVAL,
+                    created_at=created_at or timestamp(), updated_at=updated_at or timestamp(),
+                    importance=importance, access_count=access_count, tags=json_loads(tags)
+                ))
+        except Exception as e:
+            logger.error(f"Failed to load archival database: {e}")
+        self._migrate_legacy_archival()
+        logger.info(f"Loaded {len(self.archival)} archival blocks")
 
             
\ No newline at end of file
@@ -1,10 +1,13 @@
 import json
 import logging
+import sys
 import time
-from typing import Any, Dict, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
 from colorama import Fore
 from ollama import Client
-from config import DEFAULT_MODEL, HEARTBEAT_INTERVAL_SECONDS, OLLAMA_HOST, __version__, BANNER
+from config import (DEFAULT_MODEL, DEFAULT_QUANT, DEFAULT_TEMPERATURE, HEARTBEAT_INTERVAL_SECONDS, OLLAMA_HOST,
+                    SEMANTIC_CACHE_DB_PATH, __version__, BANNER)
 from local_model_wrapper import LocalModel
 from memory_system import MemoryManager
 from skill_registry import SkillRegistry
@@ -16,11 +19,25 @@ from builtin_skills import (
 )
 from server_management import ensure_server
 from mindroot import MindrootGemma
-from Utils import c
+from semantic_cache import SemanticCache
+from Utils import c, hash_content
 from ollama import Message
 
 logger = logging.getLogger(__name__)
 
+# Interactive-session strings, colorized once at import
+_HELP = c("Type 'exit' to quit | 'status' | 'memory' | 'core' | 'skills'\n", Fore.YELLOW)
+_PROMPT = c("You > ", Fore.GREEN)
+_GOODBYE_EOF = c("\n[Nexuss] Goodbye!", Fore.MAGENTA)
+_GOODBYE = c("[Nexuss] Goodbye!", Fore.MAGENTA)
+_STATUS_HDR = c("\n=== Status ===", Fore.CYAN)
+_MEMORY_HDR = c("\n=== Memory ===", Fore.CYAN)
+_CORE_HDR = c("\n=== Core Memory ===", Fore.CYAN)
+_SKILLS_HDR = c("\n=== Skills ===", Fore.CYAN)
+_THOUGHTS_HDR = c("\n=== Recent Thoughts ===", Fore.CYAN)
+_NO_MINDROOT = c("Mindroot not enabled. Use --mindroot flag.", Fore.YELLOW)
+_REPLY_PREFIX = c("\nNexuss > ", Fore.CYAN)
+
 # ══════════════════════════════════════════════════════════════════════════════
 #  NEXUSS AGENT (MAIN CLASS)
 # ══════════════════════════════════════════════════════════════════════════════
@@ -35,7 +52,9 @@ class NexussAgent:
 I remember conversations and learn over time. I operate on a heartbeat protocol."""
 
     def __init__(self, model_name: str = DEFAULT_MODEL, heartbeat_interval: float = HEARTBEAT_INTERVAL_SECONDS,
-                 local_model_path: Optional[str] = None, enable_mindroot: bool = False):
+                 local_model_path: Optional[str] = None, enable_mindroot: bool = False,
+                 quant: str = DEFAULT_QUANT, semantic_cache: bool = False,
+                 compile_model: bool = False, temperature: float = DEFAULT_TEMPERATURE):
         self.agent_id = "nexuss_main"
         self.model_name = model_name
         self.heartbeat_interval = heartbeat_interval
@@ -44,7 +63,8 @@ I remember conversations and learn over time. I operate on a heartbeat protocol.
 
         if local_model_path:
             # Use local Transformers model
-            self.llm = LocalModel(local_model_path)
+            self.llm = LocalModel(local_model_path, quant=quant, compile_model=compile_model,
+                                  temperature=temperature)
             self.client = None
         else:
             # Use Ollama client (original behavior)
@@ -79,6 +99,12 @@ I remember conversations and learn over time. I operate on a heartbeat protocol.
         else:
             self.mindroot = None
 
+        # Semantic cache: answer paraphrases of earlier questions without an LLM call
+        self.semantic_cache = SemanticCache(db_path=SEMANTIC_CACHE_DB_PATH) if semantic_cache else None
+        self._embed = lru_cache(maxsize=1024)(self._embed_uncached)
+        # Status only changes between beats / thoughts; reuse the rendered JSON
+        self._status_json = lru_cache(maxsize=4)(self._render_status_json)
+
         logger.info(f"NexussAgent initialized (model: {model_name}, mindroot={enable_mindroot})")
 
     def _register_builtin_skills(self) -> None:
@@ -108,6 +134,9 @@ I remember conversations and learn over time. I operate on a heartbeat protocol.
         if self.mindroot:
             self.mindroot.stop()
         self.heartbeat.stop()
+        self.memory.close()
+        if self.semantic_cache is not None:
+            self.semantic_cache.close()
         logger.info("Nexuss Agent stopped")
 
     def send_message(self, message: str) -> None:
@@ -117,10 +146,14 @@ I remember conversations and learn over time. I operate on a heartbeat protocol.
         # Local model inference can be slow on CPU — use longer timeout
         if self.local_model_path:
             timeout = max(timeout, 300.0)
-        deadline = time.time() + timeout
+        deadline = time.monotonic() + timeout
         responses = []
-        while time.time() < deadline:
-            output = self.heartbeat.get_output(timeout=0.5)
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            # Block until the first reply; after that only linger briefly for follow-ups
+            output = self.heartbeat.get_output(timeout=min(remaining, 0.5) if responses else remaining)
             if output:
                 msg_type, content = output
                 if msg_type == "message":
@@ -131,9 +164,40 @@ I remember conversations and learn over time. I operate on a heartbeat protocol.
                 break
         return "\n".join(responses) if responses else None
 
+    def _embed_uncached(self, text: str) -> List[float]:
+        if self.client is None:
+            return self.llm.embed(text)
+        return self.client.embed(model=self.model_name, input=text)["embeddings"][0]
+
+    def _cache_namespace(self) -> str:
+        # Answers depend on the model and on who the agent currently is
+        return f"{self.model_name}:{hash_content(self.memory.get_core_memory())}"
+
     def chat(self, message: str) -> str:
+        if self.semantic_cache is None:
+            self.send_message(message)
+            return self.get_response() or "[No response]"
+
+        namespace = self._cache_namespace()
+        try:
+            query = self._embed(message)
+        except Exception as e:
+            logger.warning(f"Semantic cache embedding failed: {e}")
+            query = None
+        if query is not None:
+            cached = self.semantic_cache.lookup(namespace, query)
+            if cached is not None:
+                # Skip the heartbeat entirely, but keep the exchange in conversational memory
+                logger.info("Semantic cache hit")
+                self.memory.add_to_recall(Message(role="user", content=message))
+                self.memory.add_to_recall(Message(role="assistant", content=cached))
+                return cached
+
         self.send_message(message)
-        return self.get_response() or "[No response]"
+        response = self.get_response()
+        if response and query is not None and not response.startswith("[Error]"):
+            self.semantic_cache.insert(namespace, query, response)
+        return response or "[No response]"
 
     def get_status(self) -> Dict[str, Any]:
         status = {
@@ -141,6 +205,10 @@ I remember conversations and learn over time. I operate on a heartbeat protocol.
             "version": __version__, "heartbeat": self.heartbeat.get_status(),
             "mindroot": self.mindroot is not None,
         }
+        if isinstance(self.llm, LocalModel):
+            status["local_model"] = self.llm.get_status()
+        if self.semantic_cache is not None:
+            status["semantic_cache"] = self.semantic_cache.get_stats()
         if self.mindroot:
             status["mindroot_thoughts"] = len(self.mindroot.thought_history)
             recent = self.mindroot.get_recent_thoughts(1)
@@ -149,64 +217,77 @@ I remember conversations and learn over time. I operate on a heartbeat protocol.
                 status["mindroot_last_thought"] = recent[0].content
         return status
 
+    def _render_status_json(self, beat_count: int, thought_count: int) -> str:
+        return json.dumps(self.get_status(), indent=2, default=str)
+
     def interactive_session(self) -> None:
         print(c(BANNER, Fore.CYAN))
-        print(c("Type 'exit' to quit | 'status' | 'memory' | 'core' | 'skills'\n", Fore.YELLOW))
+        print(_HELP)
         self.start()
         try:
             while True:
                 try:
-                    user_input = input(c("You > ", Fore.GREEN)).strip()
+                    user_input = input(_PROMPT).strip()
                 except (EOFError, KeyboardInterrupt):
-                    print(c("\n[Nexuss] Goodbye!", Fore.MAGENTA))
+                    print(_GOODBYE_EOF)
                     break
                 if not user_input:
                     continue
                 cmd = user_input.lower()
                 if cmd == "exit":
-                    print(c("[Nexuss] Goodbye!", Fore.MAGENTA))
+                    print(_GOODBYE)
                     break
                 elif cmd == "status":
-                    print(c("\n=== Status ===", Fore.CYAN))
-                    print(json.dumps(self.get_status(), indent=2, default=str))
+                    print(_STATUS_HDR)
+                    print(self._status_json(
+                        self.heartbeat.beat_count,
+                        len(self.mindroot.thought_history) if self.mindroot else 0,
+                    ))
                     continue
                 elif cmd == "memory":
-                    print(c("\n=== Memory ===", Fore.CYAN))
+                    print(_MEMORY_HDR)
                     for k, v in self.memory.get_memory_stats().items():
                         print(f"  {k}: {v}")
                     continue
                 elif cmd == "core":
-                    print(c("\n=== Core Memory ===", Fore.CYAN))
+                    print(_CORE_HDR)
                     print(self.memory.get_core_memory())
                     continue
                 elif cmd == "skills":
-                    print(c("\n=== Skills ===", Fore.CYAN))
+                    print(_SKILLS_HDR)
                     for s in self.skills.list_skills():
                         print(f"  • {s.name}: {s.description}")
                     continue
                 elif cmd == "thoughts":
                     if self.mindroot:
                         thoughts = self.mindroot.get_recent_thoughts(5)
-                        print(c("\n=== Recent Thoughts ===", Fore.CYAN))
+                        print(_THOUGHTS_HDR)
                         for t in thoughts:
                             print(f"  [{t.topic}] {t.content}")
                         if not thoughts:
                             print("  (no thoughts yet)")
                     else:
-                        print(c("Mindroot not enabled. Use --mindroot flag.", Fore.YELLOW))
+                        print(_NO_MINDROOT)
                     continue
-                print(c("\nNexuss > ", Fore.CYAN), end="", flush=True)
+                print(_REPLY_PREFIX, end="", flush=True)
                 self.send_message(user_input)
                 deadline = time.time() + 60.0
                 got_response = False
+                streamed = False
                 while time.time() < deadline:
                     output = self.heartbeat.get_output(timeout=0.2)
                     if output:
                         msg_type, content = output
-                        if msg_type == "message":
-                            for char in content:
-                                print(c(char, Fore.WHITE), end="", flush=True)
-                                time.sleep(0.01)
+                        if msg_type == "token":
+                            # Streamed chunk; the final "message" repeats the full text
+                            sys.stdout.write(c(content, Fore.WHITE))
+                            sys.stdout.flush()
+                            streamed = True
+                        elif msg_type == "message":
+                            if not streamed:
+                                sys.stdout.write(c(content, Fore.WHITE))
+                                sys.stdout.flush()
+                            streamed = False
                             got_response = True
                         elif msg_type == "error":
                             print(c(f"[Error] {content}", Fore.RED))
@@ -4,14 +4,23 @@
 import tkinter as tk
 import threading
 import json
-import urllib.request
-import urllib.error
+import http.client
 import time
 import subprocess
 import shutil
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
+from urllib.parse import urlsplit
+
+try:
+    from orjson import dumps as _dumps, loads as _loads
+except ImportError:
+    from json import loads as _loads
+
+    def _dumps(obj):
+        return json.dumps(obj).encode()
 
 # ══════════════════════════════════════════════════════════════════════════════
 #  THEME
@@ -30,6 +39,16 @@ RED     = "#f85149"
 YELLOW  = "#d29922"
 
 SERVICE_URL = "http://127.0.0.1:7860"
+POLL_INTERVAL = 5.0       # Seconds between polls while status is changing
+POLL_INTERVAL_MAX = 30.0  # Backoff cap while status is unchanged
+_SERVICE = urlsplit(SERVICE_URL)
+_JSON_HEADERS = {"Content-Type": "application/json"}
+_NO_HEADERS = {}
+EMPTY_JSON = b"{}"
+
+# A reused keep-alive socket may have been closed by the server between calls
+_STALE_CONN_ERRORS = (http.client.RemoteDisconnected, http.client.CannotSendRequest,
+                      http.client.BadStatusLine, ConnectionResetError, BrokenPipeError)
 
 
 # ══════════════════════════════════════════════════════════════════════════════
@@ -49,11 +68,22 @@ class NexussChat:
         self.connected = False
         self.waiting = False
         self.info_labels = {}
+        self.info_vars = {}  # Sidebar key -> StringVar bound to its label
+        self._pending_chat_ops = []  # (text, tag) inserts; text=None deletes that tag's range
+        self._chat_flush_scheduled = False
+        self._ts_cache = (0, "")  # (minute bucket, formatted time)
+        self._label_shown = {}  # Sidebar key -> (text, fg) last configured
+        # Every HTTP call runs on this pool; only the poll loop has its own thread
+        self._pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="gui-http")
+        self._local = threading.local()  # One persistent HTTPConnection per thread
 
         self._build()
         self._dark_titlebar()
 
         # Start polling for service status
+        self._poll_interval = POLL_INTERVAL
+        self._last_status = None
+        self._unchanged_polls = 0
         self._alive = True
         threading.Thread(target=self._poll_loop, daemon=True).start()
 
@@ -106,7 +136,7 @@ class NexussChat:
 
         self.chat = tk.Text(
             chat_frame, bg=BG2, fg=TEXT, font=("Segoe UI", 11),
-            wrap=tk.WORD, state=tk.DISABLED, bd=0,
+            wrap=tk.WORD, bd=0,
             padx=14, pady=10, spacing3=2, cursor="arrow",
             selectbackground=ACCENT, selectforeground="#fff",
             highlightthickness=1, highlightbackground=BORDER,
@@ -117,6 +147,11 @@ class NexussChat:
         vsb.pack(side=tk.RIGHT, fill=tk.Y)
         self.chat.pack(fill=tk.BOTH, expand=True)
 
+        # Read-only without state toggles: swallow edits, keep copy / select-all
+        self.chat.bind("<Key>", self._chat_key)
+        for seq in ("<<Paste>>", "<<Cut>>", "<<Clear>>", "<<PasteSelection>>"):
+            self.chat.bind(seq, lambda _: "break")
+
         # Text tags
         for tag, opts in [
             ("uname",  {"foreground": ACCENT, "font": ("Segoe UI", 11, "bold")}),
@@ -196,12 +231,14 @@ class NexussChat:
                     row, text=f"{key}:", font=("Segoe UI", 9),
                     bg=BG, fg=DIM, width=11, anchor=tk.W,
                 ).pack(side=tk.LEFT)
+                var = tk.StringVar(value="\u2014")
                 lbl = tk.Label(
-                    row, text="\u2014", font=("Segoe UI", 9),
+                    row, textvariable=var, font=("Segoe UI", 9),
                     bg=BG, fg=TEXT, anchor=tk.W,
                 )
                 lbl.pack(side=tk.LEFT, fill=tk.X, expand=True)
                 self.info_labels[key] = lbl
+                self.info_vars[key] = var
 
         # Service control
         tk.Frame(parent, bg=BORDER, height=1).pack(fill=tk.X, pady=8)
@@ -239,20 +276,53 @@ class NexussChat:
     #  CHAT METHODS
     # ══════════════════════════════════════════════════════════════════════
 
-    def _sys(self, text):
-        self.chat.configure(state=tk.NORMAL)
-        self.chat.insert(tk.END, f"{text}\n\n", "sys")
-        self.chat.configure(state=tk.DISABLED)
+    def _queue_chat(self, *ops):
+        """Queue chat edits; they are applied together on the next idle tick."""
+        self._pending_chat_ops.extend(ops)
+        if not self._chat_flush_scheduled:
+            self._chat_flush_scheduled = True
+            self.root.after_idle(self._flush_chat)
+
+    def _flush_chat(self):
+        self._chat_flush_scheduled = False
+        ops, self._pending_chat_ops = self._pending_chat_ops, []
+        if not ops:
+            return
+        args = []
+        for text, tag in ops:
+            if text is not None:
+                args += (text, tag)
+                continue
+            # Deletion: apply the inserts queued before it first
+            if args:
+                self.chat.insert(tk.END, *args)
+                args = []
+            ranges = self.chat.tag_ranges(tag)
+            if ranges:
+                self.chat.delete(ranges[0], ranges[-1])
+        if args:
+            self.chat.insert(tk.END, *args)
         self.chat.see(tk.END)
 
+    @staticmethod
+    def _chat_key(event):
+        if event.state & 0x4 and event.keysym.lower() in ("c", "a"):
+            return None
+        return "break"
+
+    def _sys(self, text):
+        self._queue_chat((f"{text}\n\n", "sys"))
+
     def _msg(self, name, text, is_user=False):
-        now = datetime.now().strftime("%I:%M %p")
-        self.chat.configure(state=tk.NORMAL)
-        self.chat.insert(tk.END, name, "uname" if is_user else "bname")
-        self.chat.insert(tk.END, f"  {now}\n", "ts")
-        self.chat.insert(tk.END, f"{text}\n\n", "umsg" if is_user else "bmsg")
-        self.chat.configure(state=tk.DISABLED)
-        self.chat.see(tk.END)
+        bucket = int(time.time() // 60)
+        if bucket != self._ts_cache[0]:
+            self._ts_cache = (bucket, datetime.now().strftime("%I:%M %p"))
+        now = self._ts_cache[1]
+        self._queue_chat(
+            (name, "uname" if is_user else "bname"),
+            (f"  {now}\n", "ts"),
+            (f"{text}\n\n", "umsg" if is_user else "bmsg"),
+        )
 
     def _focus_in(self, _):
         if self.entry.get() == "Type a message...":
@@ -265,6 +335,41 @@ class NexussChat:
             self.entry.insert(0, "Type a message...")
             self.entry.configure(fg=DIM)
 
+    # ══════════════════════════════════════════════════════════════════════
+    #  HTTP
+    # ══════════════════════════════════════════════════════════════════════
+
+    def _request(self, method, path, body=None, timeout=5):
+        """JSON request to the service over this thread's keep-alive connection."""
+        headers = _JSON_HEADERS if body is not None else _NO_HEADERS
+        for attempt in (0, 1):
+            conn = getattr(self._local, "conn", None)
+            if conn is None:
+                conn = http.client.HTTPConnection(_SERVICE.hostname, _SERVICE.port, timeout=timeout)
+                self._local.conn = conn
+            conn.timeout = timeout
+            reused = conn.sock is not None
+            if reused:
+                conn.sock.settimeout(timeout)
+            sent = False
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                sent = True
+                r = conn.getresponse()
+                data = r.read()
+            except _STALE_CONN_ERRORS:
+                conn.close()
+                # Once sent, a POST may already have been processed: only GETs are replayed
+                if attempt or not reused or (sent and method != "GET"):
+                    raise
+                continue
+            except Exception:
+                conn.close()
+                raise
+            if r.status >= 400:
+                raise http.client.HTTPException(f"HTTP {r.status} from {path}")
+            return _loads(data) if data else {}
+
     # ══════════════════════════════════════════════════════════════════════
     #  SEND / RECEIVE
     # ══════════════════════════════════════════════════════════════════════
@@ -279,28 +384,20 @@ class NexussChat:
 
         self.entry.delete(0, tk.END)
         self._msg("You", text, is_user=True)
+        self._poll_interval = POLL_INTERVAL
 
         self.waiting = True
         self.send_btn.configure(state=tk.DISABLED, bg=BG3)
 
         # Show thinking indicator
-        self.chat.configure(state=tk.NORMAL)
-        self.chat.insert(tk.END, "Nexuss is thinking...\n\n", "think")
-        self.chat.configure(state=tk.DISABLED)
-        self.chat.see(tk.END)
+        self._queue_chat(("Nexuss is thinking...\n\n", "think"))
 
-        threading.Thread(target=self._do_send, args=(text,), daemon=True).start()
+        self._pool.submit(self._do_send, text)
 
     def _do_send(self, text):
         try:
-            data = json.dumps({"message": text}).encode()
-            req = urllib.request.Request(
-                f"{SERVICE_URL}/chat", data=data, method="POST",
-                headers={"Content-Type": "application/json"},
-            )
-            r = urllib.request.urlopen(req, timeout=600)
-            resp = json.loads(r.read()).get("response", "[No response]")
-        except urllib.error.URLError:
+            resp = self._request("POST", "/chat", _dumps({"message": text}), timeout=600).get("response", "[No response]")
+        except (OSError, http.client.HTTPException):
             resp = "[Error: Service not responding]"
         except Exception as e:
             resp = f"[Error: {e}]"
@@ -308,12 +405,7 @@ class NexussChat:
 
     def _on_reply(self, text):
         # Remove thinking indicator (all text with "think" tag)
-        self.chat.configure(state=tk.NORMAL)
-        ranges = self.chat.tag_ranges("think")
-        if ranges:
-            self.chat.delete(ranges[0], ranges[-1])
-        self.chat.configure(state=tk.DISABLED)
-
+        self._queue_chat((None, "think"))
         self._msg("Nexuss", text)
         self.waiting = False
         self.send_btn.configure(state=tk.NORMAL, bg=ACCENT)
@@ -325,21 +417,15 @@ class NexussChat:
 
     def _poll_loop(self):
         while self._alive:
-            ok = self._health_ok()
+            # One /status round-trip answers both "is it up?" and "what changed?"
+            ok = self._fetch_status(timeout=3) is not None
             if ok and not self.connected:
                 self.root.after(0, self._on_connect)
             elif not ok and self.connected:
                 self.root.after(0, self._on_disconnect)
-            if ok:
-                self.root.after(0, self._refresh_status)
-            time.sleep(5)
-
-    def _health_ok(self):
-        try:
-            r = urllib.request.urlopen(f"{SERVICE_URL}/health", timeout=3)
-            return json.loads(r.read()).get("status") == "ok"
-        except Exception:
-            return False
+            if not ok:
+                self._poll_interval = POLL_INTERVAL
+            time.sleep(self._poll_interval)
 
     def _on_connect(self):
         self.connected = True
@@ -363,80 +449,100 @@ class NexussChat:
     def _fetch_model_info(self):
         def _f():
             try:
-                r = urllib.request.urlopen(f"{SERVICE_URL}/model-info", timeout=5)
-                info = json.loads(r.read())
-                self.root.after(0, self._set_model_info, info)
+                info = self._request("GET", "/model-info")
+                self.root.after_idle(self._apply_labels, self._model_labels(info))
             except Exception:
                 pass
-        threading.Thread(target=_f, daemon=True).start()
-
-    def _set_model_info(self, info):
-        L = self.info_labels
-        L["Name"].configure(text=info.get("model_name", "\u2014"))
-        L["Device"].configure(text=info.get("device", "\u2014"))
-        L["GPU"].configure(text=info.get("gpu_name", "\u2014"))
+        self._pool.submit(_f)
 
+    @staticmethod
+    def _model_labels(info):
         vt = info.get("vram_total_gb")
         vu = info.get("vram_used_gb")
-        L["VRAM"].configure(text=f"{vu}/{vt} GB" if vt else "\u2014")
-        L["Quantization"].configure(text=info.get("quantization", "\u2014"))
+        u = [
+            ("Name", info.get("model_name", "\u2014"), TEXT),
+            ("Device", info.get("device", "\u2014"), TEXT),
+            ("GPU", info.get("gpu_name", "\u2014"), TEXT),
+            ("VRAM", f"{vu}/{vt} GB" if vt else "\u2014", TEXT),
+            ("Quantization", info.get("quantization", "\u2014"), TEXT),
+        ]
 
         p = info.get("parameters")
         if p:
             if p > 1e9:
-                L["Parameters"].configure(text=f"{p/1e9:.1f}B")
+                u.append(("Parameters", f"{p/1e9:.1f}B", TEXT))
             elif p > 1e6:
-                L["Parameters"].configure(text=f"{p/1e6:.0f}M")
+                u.append(("Parameters", f"{p/1e6:.0f}M", TEXT))
             else:
-                L["Parameters"].configure(text=f"{p:,}")
+                u.append(("Parameters", f"{p:,}", TEXT))
+        return u
 
     def _refresh_status(self):
-        def _f():
-            try:
-                r = urllib.request.urlopen(f"{SERVICE_URL}/status", timeout=5)
-                data = json.loads(r.read())
-                self.root.after(0, self._set_status, data)
-            except Exception:
-                pass
-        threading.Thread(target=_f, daemon=True).start()
+        self._pool.submit(self._fetch_status)
 
-    def _set_status(self, data):
+    def _fetch_status(self, timeout=5):
+        """Fetch /status and schedule a sidebar update; None if the service is down."""
+        try:
+            data = self._request("GET", "/status", timeout=timeout)
+        except Exception:
+            return None
+        if not data.get("ok"):
+            return None
+        self._track_status_change(data)
+        self.root.after_idle(self._apply_labels, self._status_labels(data))
+        return data
+
+    def _track_status_change(self, data):
+        """Back off polling (5s -> 10s -> 20s -> 30s) while the status stays identical."""
+        snapshot = json.dumps(data, sort_keys=True)
+        if snapshot != self._last_status:
+            self._last_status = snapshot
+            self._unchanged_polls = 0
+            self._poll_interval = POLL_INTERVAL
+            return
+        self._unchanged_polls += 1
+        if self._unchanged_polls >= 3:
+            self._poll_interval = min(self._poll_interval * 2, POLL_INTERVAL_MAX)
+
+    def _apply_labels(self, updates):
+        """Apply (key, text, fg) sidebar updates in one Tk callback, skipping unchanged ones."""
+        shown = self._label_shown
+        for key, text, fg in updates:
+            shown_text, shown_fg = shown.get(key, ("\u2014", TEXT))
+            if text != shown_text:
+                self.info_vars[key].set(text)
+            if fg != shown_fg:
+                self.info_labels[key].configure(fg=fg)
+            shown[key] = (text, fg)
+
+    @staticmethod
+    def _status_labels(data):
+        """Format /status into sidebar updates; pure Python, runs on the fetching thread."""
         hb = data.get("heartbeat", {})
-        L = self.info_labels
-
+        mem = hb.get("memory_stats", {})
         state = hb.get("state", "\u2014")
-        L["State"].configure(
-            text=state,
-            fg=GREEN if state == "IDLE" else YELLOW,
-        )
-        L["Count"].configure(text=str(hb.get("beat_count", "\u2014")))
-        L["Interval"].configure(text=f"{hb.get('interval_seconds', '\u2014')}s")
+        interval = hb.get("interval_seconds", "\u2014")
         lb = hb.get("last_heartbeat")
-        L["Last Beat"].configure(text=lb[:19] if lb else "\u2014")
-
-        mem = hb.get("memory_stats", {})
-        L["Core"].configure(
-            text=f"{mem.get('core_characters', 0)}/{mem.get('core_limit', 0)}"
-        )
-        L["Recall"].configure(
-            text=f"{mem.get('recall_messages', 0)}/{mem.get('recall_limit', 0)}"
-        )
-        L["Archival"].configure(text=str(mem.get("archival_blocks", 0)))
-
-        # Mindroot
         mr_active = data.get("mindroot", False)
-        L["Active"].configure(
-            text="Yes" if mr_active else "No",
-            fg=GREEN if mr_active else DIM,
-        )
-        L["Thoughts"].configure(text=str(data.get("mindroot_thoughts", 0)))
         last_thought = data.get("mindroot_last_thought", "")
         last_topic = data.get("mindroot_last_topic", "")
-        L["Last Topic"].configure(text=last_topic or "\u2014")
         # Truncate thought to fit sidebar
         if last_thought and len(last_thought) > 40:
             last_thought = last_thought[:37] + "..."
-        L["Last Thought"].configure(text=last_thought or "\u2014")
+        return [
+            ("State", state, GREEN if state == "IDLE" else YELLOW),
+            ("Count", str(hb.get("beat_count", "\u2014")), TEXT),
+            ("Interval", f"{interval}s", TEXT),
+            ("Last Beat", lb[:19] if lb else "\u2014", TEXT),
+            ("Core", f"{mem.get('core_characters', 0)}/{mem.get('core_limit', 0)}", TEXT),
+            ("Recall", f"{mem.get('recall_messages', 0)}/{mem.get('recall_limit', 0)}", TEXT),
+            ("Archival", str(mem.get("archival_blocks", 0)), TEXT),
+            # Mindroot
+            ("Active", "Yes" if mr_active else "No", GREEN if mr_active else DIM),
+            ("Thoughts", str(data.get("mindroot_thoughts", 0)), TEXT),
+            ("Last Topic", last_topic or "\u2014", TEXT),
+            ("Last Thought", last_thought or "\u2014", TEXT),
+        ]
 
     # ══════════════════════════════════════════════════════════════════════
     #  SERVICE CONTROL
@@ -445,6 +551,7 @@ class NexussChat:
     def _start_service(self):
         self.svc_btn.configure(state=tk.DISABLED, text="Starting...", bg=YELLOW)
         self._sys("Starting Nexuss Service...")
+        # Startup can take minutes; keep it off the two-worker request pool
         threading.Thread(target=self._do_start_svc, daemon=True).start()
 
     def _manual_beat(self):
@@ -453,19 +560,15 @@ class NexussChat:
         self.beat_btn.configure(state=tk.DISABLED, bg=YELLOW, fg="#000")
         def _do():
             try:
-                req = urllib.request.Request(
-                    f"{SERVICE_URL}/beat", data=b"{}", method="POST",
-                    headers={"Content-Type": "application/json"},
-                )
-                urllib.request.urlopen(req, timeout=5)
+                self._request("POST", "/beat", EMPTY_JSON)
             except Exception:
                 pass
-            time.sleep(1)
-            self.root.after(0, lambda: (
+            # Let the beat run, without parking a pool worker in sleep()
+            self.root.after(1000, lambda: (
                 self.beat_btn.configure(state=tk.NORMAL, bg=BG3, fg=TEXT),
                 self._refresh_status(),
             ))
-        threading.Thread(target=_do, daemon=True).start()
+        self._pool.submit(_do)
 
     def _manual_thought(self):
         if not self.connected:
@@ -474,17 +577,12 @@ class NexussChat:
         self._sys("Generating thought...")
         def _do():
             try:
-                req = urllib.request.Request(
-                    f"{SERVICE_URL}/thought", data=b"{}", method="POST",
-                    headers={"Content-Type": "application/json"},
-                )
-                urllib.request.urlopen(req, timeout=5)
+                self._request("POST", "/thought", EMPTY_JSON)
             except Exception:
                 pass
             # Wait for thought to generate then refresh
-            time.sleep(8)
-            self.root.after(0, self._after_thought)
-        threading.Thread(target=_do, daemon=True).start()
+            self.root.after(8000, self._after_thought)
+        self._pool.submit(_do)
 
     def _after_thought(self):
         self.thought_btn.configure(state=tk.NORMAL, bg=BG3, fg=TEXT)
@@ -508,7 +606,9 @@ class NexussChat:
         # Wait for service health
         for _ in range(60):
             time.sleep(2)
-            if self._health_ok():
+            if not self._alive:
+                return
+            if self._fetch_status(timeout=3) is not None:
                 self.root.after(0, lambda: self.svc_btn.configure(
                     state=tk.NORMAL, text="Start Service", bg=GREEN))
                 return
@@ -523,6 +623,7 @@ class NexussChat:
 
     def _on_close(self):
         self._alive = False
+        self._pool.shutdown(wait=False, cancel_futures=True)
         self.root.destroy()
 
     def run(self):
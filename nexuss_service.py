@@ -6,89 +6,197 @@ warnings.filterwarnings("ignore", message=".*optree.*", category=FutureWarning)
 
 import sys
 import os
-import json
+import asyncio
 import signal
 import logging
 import argparse
+import functools
+import http.client
+import queue
 import subprocess
 import shutil
 import threading
 import time
+from concurrent.futures import Future
 from pathlib import Path
 from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 
-from config import DATA_DIR, __version__, __codename__
+try:
+    from aiohttp import web
+except ImportError:
+    web = None
+
+try:
+    import uvloop
+except ImportError:  # Not available on Windows
+    uvloop = None
+
+from config import DATA_DIR, DEFAULT_QUANT, DEFAULT_TEMPERATURE, QUANT_MODES, __version__, __codename__
 from nexuss_agent import NexussAgent
+from Utils import json_dumps, json_loads, start_queue_logging
 
 SERVICE_PORT = 7860
 SERVICE_HOST = "127.0.0.1"
 PID_FILE = DATA_DIR / "nexuss_service.pid"
 DEFAULT_MODEL_PATH = str(Path.home() / "Desktop" / "llm" / "gemma_model")
+MAX_BODY = 1 << 20  # Largest accepted request body (bytes)
+STARTUP_TASK = "NexussService"
 
 logger = logging.getLogger("NexussService")
 
+# Constant responses are encoded once; frontends write bytes payloads as-is
+_HEALTH_BODY = json_dumps({"status": "ok", "version": __version__})
+_NOT_FOUND_BODY = json_dumps({"error": "not found"})
+
 # ── Global state ──────────────────────────────────────────────────────────
 _agent = None
-_model_info = {}
-_shutdown_event = threading.Event()
-_chat_lock = threading.Lock()
+_static_model_info = {}  # Computed once at startup; /model-info only adds live fields
+_shutdown_event = threading.Event()  # Threaded frontend and Windows only
+_request_shutdown = _shutdown_event.set  # Rebound by the asyncio frontend to wake its loop
+_chat_worker = None
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#  CHAT WORKER
+# ══════════════════════════════════════════════════════════════════════════════
+
+class _ChatWorker:
+    """Single chat worker: one agent.chat() per request, in arrival order."""
+
+    def __init__(self, agent):
+        self.agent = agent
+        self._q = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="ChatWorker")
+        self._thread.start()
+
+    def submit(self, message):
+        fut = Future()
+        self._q.put((message, fut))
+        return fut
+
+    def close(self):
+        self._q.put(None)
+
+    def _run(self):
+        while True:
+            item = self._q.get()
+            if item is None:
+                return
+            message, fut = item
+            try:
+                fut.set_result({"response": self.agent.chat(message)})
+            except Exception as e:
+                fut.set_exception(e)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#  API
+# ══════════════════════════════════════════════════════════════════════════════
+# Endpoint bodies shared by both HTTP frontends: each takes the parsed JSON
+# body and returns (payload, status). A payload may be a Future when the
+# answer is produced elsewhere (/chat); frontends wait on it their own way.
+
+def _api_health(_body):
+    return _HEALTH_BODY, 200
+
+
+def _api_model_info(_body):
+    return {**_static_model_info, **_dynamic_model_info()}, 200
+
+
+def _api_status(_body):
+    # "ok" lets the GUI use this one endpoint as its health check too
+    return ({**_agent.get_status(), "ok": True} if _agent else {"ok": True}), 200
+
+
+def _api_chat(body):
+    msg = body.get("message", "").strip()
+    if not msg:
+        return {"error": "empty message"}, 400
+    return _chat_worker.submit(msg), 200
+
+
+def _api_shutdown(_body):
+    threading.Thread(target=_request_shutdown, daemon=True).start()
+    return {"status": "shutting down"}, 200
+
+
+def _api_beat(_body):
+    if not _agent:
+        return {"error": "agent not ready"}, 503
+    _agent.heartbeat.request_heartbeat()
+    return {"status": "heartbeat triggered"}, 200
+
+
+def _api_thought(_body):
+    if not (_agent and _agent.mindroot):
+        return {"error": "mindroot not active"}, 503
+    def _gen():
+        t = _agent.mindroot.generate_thought()
+        if _agent.mindroot.callback:
+            _agent.mindroot.callback(t)
+    threading.Thread(target=_gen, daemon=True).start()
+    return {"status": "thought triggered"}, 200
+
+
+_GET_ROUTES = {
+    "/health": _api_health,
+    "/model-info": _api_model_info,
+    "/status": _api_status,
+}
+_POST_ROUTES = {
+    "/chat": _api_chat,
+    "/shutdown": _api_shutdown,
+    "/beat": _api_beat,
+    "/thought": _api_thought,
+}
+_ROUTES_BY_METHOD = {"GET": _GET_ROUTES, "POST": _POST_ROUTES}
+_EMPTY = {}  # Shared read-only "no routes" / "no body"; never mutated
 
 
 # ══════════════════════════════════════════════════════════════════════════════
-#  HTTP API HANDLER
+#  HTTP FRONTENDS
 # ══════════════════════════════════════════════════════════════════════════════
 
 class _Handler(BaseHTTPRequestHandler):
+    """Stdlib fallback: one thread per connection, kept alive across requests."""
+
+    # Every response carries Content-Length, so HTTP/1.1 persistent connections are safe
+    protocol_version = "HTTP/1.1"
+    timeout = 75  # Close idle keep-alive sockets so their threads exit
 
     def do_GET(self):
-        routes = {
-            "/health": lambda: {"status": "ok", "version": __version__},
-            "/model-info": lambda: _model_info,
-            "/status": lambda: _agent.get_status() if _agent else {},
-        }
-        handler = routes.get(self.path)
-        if handler:
-            self._json(handler())
-        else:
-            self._json({"error": "not found"}, 404)
+        self._dispatch(_GET_ROUTES, _EMPTY)
 
     def do_POST(self):
-        if self.path == "/chat":
+        try:
             body = self._body()
-            msg = body.get("message", "").strip()
-            if not msg:
-                return self._json({"error": "empty message"}, 400)
-            with _chat_lock:
-                resp = _agent.chat(msg)
-            self._json({"response": resp})
-        elif self.path == "/shutdown":
-            self._json({"status": "shutting down"})
-            threading.Thread(target=lambda: (_shutdown_event.set()), daemon=True).start()
-        elif self.path == "/beat":
-            if _agent:
-                _agent.heartbeat._heartbeat_requested.set()
-                self._json({"status": "heartbeat triggered"})
-            else:
-                self._json({"error": "agent not ready"}, 503)
-        elif self.path == "/thought":
-            if _agent and _agent.mindroot:
-                def _gen():
-                    t = _agent.mindroot.generate_thought()
-                    if _agent.mindroot.callback:
-                        _agent.mindroot.callback(t)
-                threading.Thread(target=_gen, daemon=True).start()
-                self._json({"status": "thought triggered"})
-            else:
-                self._json({"error": "mindroot not active"}, 503)
-        else:
-            self._json({"error": "not found"}, 404)
+        except OverflowError:
+            self.close_connection = True  # The unread body would corrupt the next request
+            return self._json({"error": "request body too large"}, 413)
+        except ValueError:
+            return self._json({"error": "invalid JSON"}, 400)
+        self._dispatch(_POST_ROUTES, body)
+
+    def _dispatch(self, routes, body):
+        fn = routes.get(self.path)
+        if fn is None:
+            return self._json(_NOT_FOUND_BODY, 404)
+        payload, code = fn(body)
+        if isinstance(payload, Future):
+            payload = payload.result()
+        self._json(payload, code)
 
     def _body(self):
         n = int(self.headers.get("Content-Length", 0))
-        return json.loads(self.rfile.read(n)) if n else {}
+        if n <= 0:
+            return _EMPTY
+        if n > MAX_BODY:
+            raise OverflowError(f"body of {n} bytes exceeds {MAX_BODY}")
+        return json_loads(self.rfile.read(n))
 
     def _json(self, data, code=200):
-        body = json.dumps(data, default=str).encode()
+        body = _encode(data)
         self.send_response(code)
         self.send_header("Content-Type", "application/json")
         self.send_header("Content-Length", str(len(body)))
@@ -99,6 +207,69 @@ class _Handler(BaseHTTPRequestHandler):
         pass
 
 
+def _json_default(o):
+    # Only reached for types the encoder can't handle itself (orjson covers
+    # datetime, dataclasses and numpy natively)
+    if isinstance(o, os.PathLike):
+        return os.fspath(o)
+    if hasattr(o, "tolist"):  # numpy / torch scalars and arrays
+        return o.tolist()
+    if hasattr(o, "isoformat"):  # datetime under the stdlib fallback
+        return o.isoformat()
+    return str(o)  # e.g. torch.device; never fail a status response over a field
+
+
+def _encode(data):
+    return data if isinstance(data, bytes) else json_dumps(data, default=_json_default)
+
+
+async def _aio_handle(request):
+    routes = _ROUTES_BY_METHOD.get(request.method, _EMPTY)
+    fn = routes.get(request.path)
+    if fn is None:
+        return web.Response(body=_NOT_FOUND_BODY, status=404, content_type="application/json")
+    try:
+        # Oversized bodies are rejected with 413 by aiohttp itself (client_max_size)
+        body = await request.json(loads=json_loads) if request.body_exists else _EMPTY
+    except ValueError:
+        return web.Response(body=json_dumps({"error": "invalid JSON"}), status=400,
+                            content_type="application/json")
+    payload, code = fn(body)
+    if isinstance(payload, Future):
+        payload = await asyncio.wrap_future(payload)
+    return web.Response(body=_encode(payload), status=code, content_type="application/json")
+
+
+def _serve_threaded(port):
+    server = ThreadingHTTPServer((SERVICE_HOST, port), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    _shutdown_event.wait()
+    server.shutdown()
+
+
+async def _serve_aiohttp(port):
+    global _request_shutdown
+    app = web.Application(client_max_size=MAX_BODY)
+    app.router.add_route("*", "/{path:.*}", _aio_handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, SERVICE_HOST, port).start()
+    loop = asyncio.get_running_loop()
+    try:
+        if sys.platform == "win32":
+            # No add_signal_handler on Windows: park an executor thread on the Event
+            await loop.run_in_executor(None, _shutdown_event.wait)
+        else:
+            # Signals arrive through the loop's wakeup fd, so stop is immediate
+            stop = asyncio.Event()
+            for sig_id in (signal.SIGINT, signal.SIGTERM):
+                loop.add_signal_handler(sig_id, stop.set)
+            _request_shutdown = functools.partial(loop.call_soon_threadsafe, stop.set)
+            await stop.wait()
+    finally:
+        await runner.cleanup()
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 #  HELPERS
 # ══════════════════════════════════════════════════════════════════════════════
@@ -116,39 +287,73 @@ def _collect_info(agent):
     if agent.local_model_path and hasattr(agent.llm, "model"):
         m = agent.llm.model
         info["model_path"] = str(agent.local_model_path)
-        info["device"] = str(next(m.parameters()).device)
-        info["parameters"] = sum(p.numel() for p in m.parameters())
+        # One pass over the weights: count, device and per-dtype totals together
+        total, device, dtypes = 0, None, {}
+        for p in m.parameters():
+            n = p.numel()
+            total += n
+            if device is None:
+                device = p.device
+            key = str(p.dtype).removeprefix("torch.")
+            dtypes[key] = dtypes.get(key, 0) + n
+        info["device"] = str(device)
+        info["parameters"] = total
+        info["dtypes"] = dtypes
         info["vocab_size"] = agent.llm.tokenizer.vocab_size
         if torch.cuda.is_available():
             info["gpu_name"] = torch.cuda.get_device_name(0)
             info["vram_total_gb"] = round(
                 torch.cuda.get_device_properties(0).total_memory / 1024**3, 1)
-            info["vram_used_gb"] = round(
-                torch.cuda.memory_allocated(0) / 1024**3, 2)
-            info["quantization"] = "4-bit NF4"
         else:
             info["gpu_name"] = "CPU"
-            info["quantization"] = "None (float32)"
+        info["quantization"] = agent.llm.quantization
     return info
 
 
+def _dynamic_model_info():
+    if "vram_total_gb" not in _static_model_info:
+        return {}
+    import torch
+    return {"vram_used_gb": round(torch.cuda.memory_allocated(0) / 1024**3, 2)}
+
+
 def _pid_alive(pid):
-    try:
-        import psutil
-        return psutil.pid_exists(pid)
-    except ImportError:
+    if sys.platform != "win32":
         try:
-            os.kill(pid, 0)
+            os.kill(pid, 0)  # Signal 0: existence/permission check only
             return True
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True  # Exists, owned by someone else
         except OSError:
             return False
+    # On Windows os.kill(pid, 0) would terminate the process; ask the kernel instead
+    import ctypes
+    kernel32 = ctypes.windll.kernel32
+    handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+    if not handle:
+        return False
+    try:
+        code = ctypes.c_ulong()
+        return bool(kernel32.GetExitCodeProcess(handle, ctypes.byref(code))) and code.value == 259  # STILL_ACTIVE
+    finally:
+        kernel32.CloseHandle(handle)
 
 
+@functools.lru_cache(maxsize=1)  # CLI commands are one-shot; the service writes it once
 def _read_pid():
+    # Raw read: one open + one read, no exists() race and no text-layer setup
     try:
-        return int(PID_FILE.read_text().strip()) if PID_FILE.exists() else None
+        fd = os.open(PID_FILE, os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        return int(os.read(fd, 32))
     except (ValueError, OSError):
         return None
+    finally:
+        os.close(fd)
 
 
 def _is_running():
@@ -156,12 +361,42 @@ def _is_running():
     return pid is not None and _pid_alive(pid)
 
 
+def _service_request(method, path, body=None, timeout=3):
+    """One-shot JSON call to the running service (each CLI command makes a single request)."""
+    conn = http.client.HTTPConnection(SERVICE_HOST, SERVICE_PORT, timeout=timeout)
+    headers = {"Content-Type": "application/json"} if body is not None else {}
+    try:
+        conn.request(method, path, body=body, headers=headers)
+        r = conn.getresponse()
+        data = r.read()
+    finally:
+        conn.close()
+    if r.status >= 400:
+        raise http.client.HTTPException(f"HTTP {r.status} from {path}")
+    return json_loads(data) if data else {}
+
+
+def _task_scheduler():
+    """Connected Task Scheduler COM service, or None without pywin32."""
+    try:
+        from win32com.client import Dispatch
+    except ImportError:
+        return None
+    try:
+        scheduler = Dispatch("Schedule.Service")
+        scheduler.Connect()
+    except Exception as e:
+        logger.debug(f"Task Scheduler COM unavailable, using schtasks: {e}")
+        return None
+    return scheduler
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 #  COMMANDS
 # ══════════════════════════════════════════════════════════════════════════════
 
 def cmd_start(args):
-    global _agent, _model_info
+    global _agent, _static_model_info, _chat_worker
 
     if _is_running():
         print(f"Already running (PID {_read_pid()})")
@@ -173,7 +408,10 @@ def cmd_start(args):
         cmd = [exe or sys.executable]
         if not exe:
             cmd.append(__file__)
-        cmd += ["start", "--model-path", args.model_path, "--port", str(args.port)]
+        cmd += ["start", "--model-path", args.model_path, "--port", str(args.port),
+                "--quant", args.quant, "--temperature", str(args.temperature)]
+        if args.compile:
+            cmd.append("--compile")
         kw = {"stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL}
         if sys.platform == "win32":
             si = subprocess.STARTUPINFO()
@@ -188,41 +426,50 @@ def cmd_start(args):
         return
 
     # ── Foreground mode ──────────────────────────────────────────────────
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-        handlers=[
-            logging.FileHandler(DATA_DIR / "service.log", encoding="utf-8"),
-            logging.StreamHandler(),
-        ],
+    # File/console writes happen on a listener thread; it is stopped (and drained) at exit
+    start_queue_logging(
+        logging.FileHandler(DATA_DIR / "service.log", encoding="utf-8"),
+        logging.StreamHandler(),
     )
 
     logger.info("Loading model from %s", args.model_path)
-    _agent = NexussAgent(local_model_path=args.model_path, enable_mindroot=getattr(args, 'mindroot', False))
-    _model_info = _collect_info(_agent)
+    _agent = NexussAgent(local_model_path=args.model_path, enable_mindroot=getattr(args, 'mindroot', False),
+                         quant=args.quant, compile_model=args.compile, temperature=args.temperature)
+    _static_model_info = _collect_info(_agent)
+    _chat_worker = _ChatWorker(_agent)
     _agent.start()
 
     PID_FILE.write_text(str(os.getpid()))
+    _read_pid.cache_clear()
 
-    server = ThreadingHTTPServer((SERVICE_HOST, args.port), _Handler)
-    threading.Thread(target=server.serve_forever, daemon=True).start()
+    if web is None:
+        frontend = "threaded"
+    else:
+        frontend = "aiohttp/uvloop" if uvloop else "aiohttp"
 
     print(f"\n{'='*50}")
     print(f"  Nexuss Service v{__version__}")
     print(f"  http://{SERVICE_HOST}:{args.port}")
-    print(f"  Device: {_model_info.get('device', '?')}")
-    print(f"  GPU: {_model_info.get('gpu_name', '?')}")
+    print(f"  Device: {_static_model_info.get('device', '?')}")
+    print(f"  GPU: {_static_model_info.get('gpu_name', '?')}")
     print(f"  PID: {os.getpid()}")
+    print(f"  HTTP: {frontend}")
     print(f"{'='*50}")
     print("Press Ctrl+C to stop\n")
 
-    for sig_id in (signal.SIGINT, signal.SIGTERM):
-        signal.signal(sig_id, lambda *_: _shutdown_event.set())
+    if web is None or sys.platform == "win32":
+        for sig_id in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig_id, lambda *_: _shutdown_event.set())
 
-    _shutdown_event.wait()
+    if web is None:
+        _serve_threaded(args.port)
+    elif uvloop is not None:
+        uvloop.run(_serve_aiohttp(args.port))
+    else:
+        asyncio.run(_serve_aiohttp(args.port))
 
     logger.info("Shutting down...")
-    server.shutdown()
+    _chat_worker.close()
     _agent.stop()
     PID_FILE.unlink(missing_ok=True)
     print("Stopped.")
@@ -234,14 +481,7 @@ def cmd_stop(_):
         return
     pid = _read_pid()
     try:
-        import urllib.request
-        req = urllib.request.Request(
-            f"http://{SERVICE_HOST}:{SERVICE_PORT}/shutdown",
-            data=b"{}",
-            method="POST",
-            headers={"Content-Type": "application/json"},
-        )
-        urllib.request.urlopen(req, timeout=5)
+        _service_request("POST", "/shutdown", b"{}", timeout=5)
         print(f"Stop signal sent (PID {pid})")
     except Exception:
         os.kill(pid, signal.SIGTERM)
@@ -255,11 +495,7 @@ def cmd_status(_):
         return
     pid = _read_pid()
     try:
-        import urllib.request
-        r = urllib.request.urlopen(
-            f"http://{SERVICE_HOST}:{SERVICE_PORT}/model-info", timeout=3
-        )
-        info = json.loads(r.read())
+        info = _service_request("GET", "/model-info")
         print(f"Running (PID {pid})")
         for k, v in info.items():
             print(f"  {k}: {v}")
@@ -273,21 +509,51 @@ def cmd_install(args):
         print("nexuss-service not in PATH. Install the package first.")
         return
     mp = getattr(args, "model_path", DEFAULT_MODEL_PATH)
-    task = f'"{exe}" start --model-path "{mp}" --background'
+    arguments = f'start --model-path "{mp}" --background'
+
+    scheduler = _task_scheduler()
+    if scheduler is not None:
+        try:
+            task = scheduler.NewTask(0)
+            trigger = task.Triggers.Create(9)  # TASK_TRIGGER_LOGON
+            user = os.environ.get("USERNAME")
+            if user:
+                trigger.UserId = f"{os.environ.get('USERDOMAIN', '.')}\\{user}"
+            action = task.Actions.Create(0)  # TASK_ACTION_EXEC
+            action.Path = exe
+            action.Arguments = arguments
+            task.Principal.RunLevel = 0  # TASK_RUNLEVEL_LUA, i.e. /rl LIMITED
+            # 6 = TASK_CREATE_OR_UPDATE, 3 = TASK_LOGON_INTERACTIVE_TOKEN
+            scheduler.GetFolder("\\").RegisterTaskDefinition(STARTUP_TASK, task, 6, None, None, 3)
+            print(f"Registered for Windows startup (Task: {STARTUP_TASK})")
+        except Exception as e:
+            print(f"Failed: {e}")
+        return
+
+    task = f'"{exe}" {arguments}'
     r = subprocess.run(
-        ["schtasks", "/create", "/tn", "NexussService",
+        ["schtasks", "/create", "/tn", STARTUP_TASK,
          "/tr", task, "/sc", "ONLOGON", "/rl", "LIMITED", "/f"],
         capture_output=True, text=True,
     )
     if r.returncode == 0:
-        print("Registered for Windows startup (Task: NexussService)")
+        print(f"Registered for Windows startup (Task: {STARTUP_TASK})")
     else:
         print(f"Failed: {r.stderr}")
 
 
 def cmd_uninstall(_):
+    scheduler = _task_scheduler()
+    if scheduler is not None:
+        try:
+            scheduler.GetFolder("\\").DeleteTask(STARTUP_TASK, 0)
+            print("Startup task removed")
+        except Exception as e:
+            print(f"Failed: {e}")
+        return
+
     r = subprocess.run(
-        ["schtasks", "/delete", "/tn", "NexussService", "/f"],
+        ["schtasks", "/delete", "/tn", STARTUP_TASK, "/f"],
         capture_output=True, text=True,
     )
     print("Startup task removed" if r.returncode == 0 else f"Failed: {r.stderr}")
@@ -307,6 +573,12 @@ def main():
     s.add_argument("--port", type=int, default=SERVICE_PORT, help="API port")
     s.add_argument("--mindroot", action="store_true",
                    help="Enable stochastic background thought generation")
+    s.add_argument("--quant", choices=QUANT_MODES, default=DEFAULT_QUANT,
+                   help="Local model weight quantization (CUDA only)")
+    s.add_argument("--compile", action="store_true",
+                   help="torch.compile the model's forward pass (CUDA only)")
+    s.add_argument("--temperature", type=float, default=DEFAULT_TEMPERATURE,
+                   help="Sampling temperature (0 = greedy, enables the response cache)")
     s.add_argument("--background", action="store_true",
                    help="Run as a detached background process")
 
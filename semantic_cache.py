@@ -0,0 +1,181 @@
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import numpy as np
+from config import SEMANTIC_CACHE_SIZE, SEMANTIC_CACHE_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+# ══════════════════════════════════════════════════════════════════════════════
+#  SEMANTIC RESPONSE CACHE
+# ══════════════════════════════════════════════════════════════════════════════
+# Responses keyed by query embedding. All vectors live in one contiguous
+# (capacity x dim) float32 matrix of unit rows, so a lookup is a single
+# matrix-vector product. Each row carries a namespace id (model + persona) so
+# answers never leak across models or personas.
+#
+# With a db_path, every row is mirrored to SQLite (slot -> namespace, float32
+# blob, response, last use) and reloaded on start, so recurring queries hit
+# from the first turn of a new session. Search always stays on the matrix.
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS semantic_cache (
+    slot INTEGER PRIMARY KEY,
+    namespace TEXT NOT NULL,
+    embedding BLOB NOT NULL,
+    response TEXT NOT NULL,
+    last_used INTEGER NOT NULL
+)
+"""
+_UPSERT = "INSERT OR REPLACE INTO semantic_cache VALUES (?, ?, ?, ?, ?)"
+_TOUCH = "UPDATE semantic_cache SET last_used = ? WHERE slot = ?"
+
+try:
+    from numba import njit
+
+    @njit(cache=True, fastmath=True)
+    def _best_match(vectors, namespaces, ns, q):
+        # Fused masked dot product + argmax: no temporary sims array, no NumPy dispatch
+        best, best_sim = -1, -np.inf
+        n, d = vectors.shape
+        for i in range(n):
+            if namespaces[i] != ns:
+                continue
+            sim = 0.0
+            for j in range(d):
+                sim += vectors[i, j] * q[j]
+            if sim > best_sim:
+                best, best_sim = i, sim
+        return best, best_sim
+
+    NUMBA_ENABLED = True
+except ImportError:
+    def _best_match(vectors, namespaces, ns, q):
+        sims = vectors @ q
+        sims[namespaces != ns] = -np.inf
+        best = int(np.argmax(sims))
+        return best, float(sims[best])
+
+    NUMBA_ENABLED = False
+
+
+class SemanticCache:
+    """LRU cache of (embedding, response) pairs matched by cosine similarity."""
+
+    def __init__(self, capacity: int = SEMANTIC_CACHE_SIZE, threshold: float = SEMANTIC_CACHE_THRESHOLD,
+                 db_path: Optional[Path] = None):
+        self.capacity = capacity
+        self.threshold = threshold
+        self._vectors: Optional[np.ndarray] = None  # Allocated on first insert, once dim is known
+        self._responses: List[Optional[str]] = [None] * capacity
+        self._namespaces = np.full(capacity, -1, dtype=np.int64)  # -1 marks a free row
+        self._last_used = np.zeros(capacity, dtype=np.int64)
+        self._ns_ids: Dict[str, int] = {}
+        self._clock = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+        self._db: Optional[sqlite3.Connection] = None
+        if db_path is not None:
+            try:
+                self._db = sqlite3.connect(db_path, check_same_thread=False)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(_SCHEMA)
+                self._db.commit()
+                self._load()
+            except sqlite3.Error as e:
+                logger.warning(f"Semantic cache persistence disabled: {e}")
+                self._db = None
+
+    def _load(self) -> None:
+        rows = self._db.execute(
+            "SELECT slot, namespace, embedding, response, last_used FROM semantic_cache "
+            "WHERE slot < ? ORDER BY last_used DESC", (self.capacity,)
+        ).fetchall()
+        self._db.execute("DELETE FROM semantic_cache WHERE slot >= ?", (self.capacity,))
+        self._db.commit()
+        if not rows:
+            return
+        # Most recent row fixes the width; rows from an older embedding model are skipped
+        dim = len(rows[0][2]) // 4
+        self._vectors = np.zeros((self.capacity, dim), dtype=np.float32)
+        for slot, namespace, blob, response, last_used in rows:
+            if len(blob) != dim * 4:
+                continue
+            self._vectors[slot] = np.frombuffer(blob, dtype=np.float32)
+            self._namespaces[slot] = self._ns_ids.setdefault(namespace, len(self._ns_ids))
+            self._last_used[slot] = last_used
+            self._responses[slot] = response
+        self._clock = int(self._last_used.max())
+        logger.info(f"Semantic cache loaded {len(self)} entries")
+
+    def _persist(self, sql: str, params: tuple) -> None:
+        if self._db is None:
+            return
+        try:
+            with self._db:
+                self._db.execute(sql, params)
+        except sqlite3.Error as e:
+            logger.warning(f"Semantic cache write failed: {e}")
+
+    @staticmethod
+    def _normalize(embedding: Any) -> np.ndarray:
+        vec = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(vec))
+        return vec / norm if norm else vec
+
+    def lookup(self, namespace: str, embedding: Any) -> Optional[str]:
+        q = self._normalize(embedding)
+        with self._lock:
+            ns = self._ns_ids.get(namespace)
+            if ns is None or self._vectors is None or q.shape[0] != self._vectors.shape[1]:
+                self.stats["misses"] += 1
+                return None
+            best, sim = _best_match(self._vectors, self._namespaces, ns, q)
+            if best < 0 or sim < self.threshold:
+                self.stats["misses"] += 1
+                return None
+            self._clock += 1
+            self._last_used[best] = self._clock
+            self._persist(_TOUCH, (self._clock, best))
+            self.stats["hits"] += 1
+            return self._responses[best]
+
+    def insert(self, namespace: str, embedding: Any, response: str) -> None:
+        q = self._normalize(embedding)
+        with self._lock:
+            if self._vectors is None or q.shape[0] != self._vectors.shape[1]:
+                # First insert, or the embedding model changed: start over at the new width
+                self._vectors = np.zeros((self.capacity, q.shape[0]), dtype=np.float32)
+                self._namespaces.fill(-1)
+                self._responses = [None] * self.capacity
+                self._persist("DELETE FROM semantic_cache", ())
+            ns = self._ns_ids.setdefault(namespace, len(self._ns_ids))
+            free = np.flatnonzero(self._namespaces < 0)
+            row = int(free[0]) if free.size else int(np.argmin(self._last_used))
+            self._clock += 1
+            self._vectors[row] = q
+            self._namespaces[row] = ns
+            self._last_used[row] = self._clock
+            self._responses[row] = response
+            self._persist(_UPSERT, (row, namespace, q.tobytes(), response, self._clock))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._namespaces.fill(-1)
+            self._responses = [None] * self.capacity
+            self._persist("DELETE FROM semantic_cache", ())
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._namespaces >= 0))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "entries": len(self), "capacity": self.capacity,
+                "threshold": self.threshold, "persistent": self._db is not None, "numba": NUMBA_ENABLED}
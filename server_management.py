@@ -1,13 +1,18 @@
+import socket
 import subprocess
 import time
 import sys
 import logging
+from urllib.parse import urlsplit
 from colorama import Fore, Style
 from ollama import Client, ResponseError, ListResponse
 from config import OLLAMA_HOST, SERVER_STARTUP_TIMEOUT
 
 logger = logging.getLogger(__name__)
 
+_OLLAMA_URL = urlsplit(OLLAMA_HOST)
+_OLLAMA_ADDR = (_OLLAMA_URL.hostname or "127.0.0.1", _OLLAMA_URL.port or 11434)
+
 def c(text: str, color: str = "") -> str:
     """Colorize text if color support is enabled."""
     if not color:
@@ -18,28 +23,44 @@ def c(text: str, color: str = "") -> str:
 # ══════════════════════════════════════════════════════════════════════════════
 #  SERVER MANAGEMENT
 # ══════════════════════════════════════════════════════════════════════════════
-def is_ollama_running() -> bool:
+def _port_open(timeout: float = 0.2) -> bool:
     try:
-        result = subprocess.run(
-            ["powershell", "-Command", "Get-Process -Name ollama -ErrorAction SilentlyContinue"],
-            capture_output=True, text=True, timeout=10
-        )
-        return "ollama" in result.stdout.lower()
-    except Exception:
+        with socket.create_connection(_OLLAMA_ADDR, timeout=timeout):
+            return True
+    except OSError:
         return False
 
+def is_ollama_running() -> bool:
+    try:
+        import psutil
+    except ImportError:
+        return _port_open()
+    return any(p.info["name"] and "ollama" in p.info["name"].lower()
+               for p in psutil.process_iter(["name"]))
+
 def start_ollama_server() -> None:
-    subprocess.Popen(["powershell", "-Command", "Start-Process ollama -ArgumentList 'serve' -NoNewWindow"])
+    flags = subprocess.CREATE_NO_WINDOW if sys.platform == "win32" else 0
+    try:
+        subprocess.Popen(["ollama", "serve"], creationflags=flags,
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except FileNotFoundError:
+        print(c("[Nexuss] 'ollama' executable not found in PATH.", Fore.RED))
+        return
     print(c("[Nexuss] Ollama server starting...", Fore.YELLOW))
 
 def wait_for_server(client: Client, timeout: int = SERVER_STARTUP_TIMEOUT) -> bool:
-    deadline = time.time() + timeout
-    while time.time() < deadline:
-        try:
-            client.list()
-            return True
-        except Exception:
-            time.sleep(1)
+    # Cheap TCP probe with exponential backoff; the full API call only once the port is open
+    deadline = time.monotonic() + timeout
+    delay = 0.01
+    while time.monotonic() < deadline:
+        if _port_open(timeout=delay):
+            try:
+                client.list()
+                return True
+            except Exception:
+                pass
+        time.sleep(delay)
+        delay = min(delay * 2, 0.25)
     return False
 
 def ensure_server(client: Client) -> None:
@@ -77,13 +98,22 @@ def model_exists(client: Client, name: str) -> bool:
 def pull_model(client: Client, name: str) -> bool:
     print(f"[Nexuss] Pulling '{name}'...")
     try:
+        write = sys.stdout.write
+        last = 0.0
+        status = None
         for p in client.pull(name, stream=True):
+            # Redraw at most ~10x/s, but never drop a status change or the final 100%
+            now = time.monotonic()
+            done = bool(p.total) and p.completed == p.total
+            if now - last < 0.1 and p.status == status and not done:
+                continue
+            last, status = now, p.status
             if p.total and p.completed:
-                pct = p.completed / p.total * 100
-                print(f"\r  {p.status}: {pct:5.1f}%", end="", flush=True)
+                write(f"\r  {p.status}: {p.completed / p.total * 100:5.1f}%")
             else:
-                print(f"\r  {p.status}", end="", flush=True)
-        print("\n[Nexuss] Pull complete.")
+                write(f"\r  {p.status}")
+            sys.stdout.flush()
+        write("\n[Nexuss] Pull complete.\n")
         return True
     except ResponseError as e:
         print(f"\n[Nexuss] Pull failed: {e}")
@@ -1,6 +1,6 @@
 import threading
-import time
 import logging
+from time import perf_counter
 from typing import Dict, Optional, List, Any
 from enums_and_dataclasses import SkillResult
 from skills_tools_framework import Skill
@@ -8,22 +8,36 @@ from skills_tools_framework import Skill
 logger = logging.getLogger(__name__)
 
 class SkillRegistry:
+    """Copy-on-write registry: writers publish fresh dicts under a lock; readers never lock."""
+
     def __init__(self):
         self._skills: Dict[str, Skill] = {}
-        self._lock = threading.RLock()
+        self._lock = threading.Lock()  # Serializes writers only
+        # Tool schemas are built once per registration, not on every LLM turn
+        self._schemas_by_name: Dict[str, Dict[str, Any]] = {}
+        self._schema_cache: List[Dict[str, Any]] = []
 
     def register(self, skill: Skill) -> None:
         with self._lock:
-            self._skills[skill.name] = skill
+            schemas = {**self._schemas_by_name, skill.name: skill.to_tool_schema()}
+            self._schemas_by_name = schemas
+            self._schema_cache = list(schemas.values())
+            self._skills = {**self._skills, skill.name: skill}
             logger.info(f"Skill registered: {skill.name}")
 
     def unregister(self, name: str) -> bool:
         with self._lock:
-            if name in self._skills:
-                del self._skills[name]
-                logger.info(f"Skill unregistered: {name}")
-                return True
-            return False
+            if name not in self._skills:
+                return False
+            skills = dict(self._skills)
+            del skills[name]
+            schemas = dict(self._schemas_by_name)
+            del schemas[name]
+            self._skills = skills
+            self._schemas_by_name = schemas
+            self._schema_cache = list(schemas.values())
+            logger.info(f"Skill unregistered: {name}")
+            return True
 
     def get(self, name: str) -> Optional[Skill]:
         return self._skills.get(name)
@@ -32,17 +46,20 @@ class SkillRegistry:
         return list(self._skills.values())
 
     def get_tools_schema(self) -> List[Dict[str, Any]]:
-        return [s.to_tool_schema() for s in self._skills.values()]
+        """Cached schema list; shared between callers, treat as read-only."""
+        return self._schema_cache
 
     def execute(self, name: str, **kwargs) -> SkillResult:
         skill = self.get(name)
         if not skill:
             return SkillResult(success=False, output=None, error=f"Skill '{name}' not found")
-        start = time.time()
+        start = perf_counter()
         try:
             result = skill.execute(**kwargs)
-            result.execution_time = time.time() - start
+            # Pooled results are shared across calls and keep execution_time 0.0
+            if not result.shared:
+                result.execution_time = perf_counter() - start
             return result
         except Exception as e:
             logger.error(f"Skill error [{name}]: {e}")
-            return SkillResult(success=False, output=None, error=str(e), execution_time=time.time()-start)
+            return SkillResult(success=False, output=None, error=str(e), execution_time=perf_counter() - start)
@@ -15,7 +15,11 @@ class Skill(ABC):
         pass
 
     def to_tool_schema(self) -> Dict[str, Any]:
-        return {
+        # Built once per instance; skills don't change name/parameters after construction
+        cached = self.__dict__.get("_tool_schema")
+        if cached is not None:
+            return cached
+        schema = {
             "type": "function",
             "function": {
                 "name": self.name,
@@ -27,3 +31,5 @@ class Skill(ABC):
                 }
             }
         }
+        self.__dict__["_tool_schema"] = schema
+        return schema
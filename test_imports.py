@@ -3,11 +3,13 @@
 
 import sys
 import importlib
+from concurrent.futures import ThreadPoolExecutor
 
 modules_to_test = [
     'enums_and_dataclasses',
     'config',
     'Utils',
+    'utils_fast',
     'skill_registry',
     'skills_tools_framework',
     'server_management',
@@ -15,6 +17,8 @@ modules_to_test = [
     'attention_mechanism',
     'heartbeat_protocol',
     'builtin_skills',
+    'llm_cache',
+    'semantic_cache',
     'local_model_wrapper',
     'nexuss_agent',
     'Nexuss'
@@ -27,14 +31,31 @@ print("="*60)
 success = []
 failed = []
 
-for module_name in modules_to_test:
+
+def _try_import(module_name):
     try:
-        mod = importlib.import_module(module_name)
+        importlib.import_module(module_name)
+        return None
+    except Exception as e:
+        return str(e)
+
+
+# Imports overlap their file I/O across threads; results are reported in list order
+with ThreadPoolExecutor(max_workers=min(8, len(modules_to_test))) as ex:
+    errors = list(ex.map(_try_import, modules_to_test))
+
+# Concurrent imports of interdependent modules can see each other half-initialized,
+# which misreports the cause. Failed modules are dropped from sys.modules, so
+# retrying them one at a time yields the same error a sequential run would.
+errors = [err and _try_import(m) for m, err in zip(modules_to_test, errors)]
+
+for module_name, err in zip(modules_to_test, errors):
+    if err is None:
         success.append(module_name)
         print(f"✓ {module_name:30} OK")
-    except Exception as e:
-        failed.append((module_name, str(e)[:80]))
-        print(f"✗ {module_name:30} FAILED: {str(e)[:50]}")
+    else:
+        failed.append((module_name, err[:80]))
+        print(f"✗ {module_name:30} FAILED: {err[:50]}")
 
 print("="*60)
 print(f"Result: {len(success)}/{len(modules_to_test)} modules loaded")
@@ -0,0 +1,41 @@
+import re
+
+# ══════════════════════════════════════════════════════════════════════════════
+#  FAST TOKEN COUNTING
+# ══════════════════════════════════════════════════════════════════════════════
+# Pseudo-BPE estimate over UTF-8 bytes: every run of word bytes (ASCII
+# alphanumerics, '_' and any non-ASCII byte) costs ceil(len / 4) tokens, every
+# other non-whitespace byte costs one token, whitespace is free.
+
+try:
+    import numpy as np
+    from numba import njit
+
+    @njit(cache=True, fastmath=True)
+    def _count_tokens_kernel(buf) -> int:
+        tokens = 0
+        run = 0
+        for b in buf:
+            if (48 <= b <= 57) or (65 <= b <= 90) or (97 <= b <= 122) or b == 95 or b >= 128:
+                run += 1
+                continue
+            if run:
+                tokens += (run + 3) // 4
+                run = 0
+            if b != 32 and not (9 <= b <= 13):
+                tokens += 1
+        if run:
+            tokens += (run + 3) // 4
+        return tokens
+
+    def count_tokens(buf: bytes) -> int:
+        return int(_count_tokens_kernel(np.frombuffer(buf, dtype=np.uint8)))
+
+    NUMBA_ENABLED = True
+except ImportError:
+    _TOKEN_RE = re.compile(rb"[0-9A-Za-z_\x80-\xff]+|[^\s0-9A-Za-z_\x80-\xff]")
+
+    def count_tokens(buf: bytes) -> int:
+        return sum((len(m) + 3) // 4 for m in _TOKEN_RE.findall(buf))
+
+    NUMBA_ENABLED = False